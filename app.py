@@ -1,13 +1,35 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for, session
+from flask import Flask, Response, stream_with_context, send_from_directory, render_template, jsonify, request, redirect, url_for, session, abort
 import json
 import os
 from scraper import AnimeScraper
+from jobs import JobQueue
+from scheduler import ScrapeScheduler
+from result_cache import ENCODINGS
+from result_index import FILTER_FIELDS
+import hashlib
+import queue
+import threading
 from functools import wraps
 from datetime import datetime
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this'  # Change this in production
 scraper = AnimeScraper()
+# Scrapes run in the background; requests only enqueue them
+jobs = JobQueue(max_workers=2, progress=scraper.progress)
+# Adaptive periodic re-scrapes, started with the server (see __main__)
+scheduler = ScrapeScheduler(scraper, jobs)
+
+def queue_thumbnails():
+    """Cache posters in the background after every finished site scrape"""
+    events = scraper.progress.subscribe()
+    while True:
+        event = events.get()
+        if event['type'] == 'site_finished' and event['success']:
+            jobs.submit(('thumbnails', event['site']), f"Cache thumbnail {event['site']}",
+                        scraper.cache_thumbnails, [event['site']])
+
+threading.Thread(target=queue_thumbnails, name='thumbnail-queue', daemon=True).start()
 
 # Simple admin authentication
 ADMIN_USERNAME = 'admin'
@@ -22,59 +44,216 @@ def login_required(f):
     return decorated_function
 
 def load_json(filename):
-    """Load JSON file"""
-    try:
-        with open(f'results/{filename}', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return None
+    """Load a results/ JSON file through the shared result cache (read-only)"""
+    return scraper.results.get(filename)
+
+def json_file_response(filename):
+    """Serve a results/ file from its cached, pre-serialized bytes.
+
+    Answers If-None-Match with 304 and sends the precompressed variant the
+    client accepts; clients revalidate on every poll via Cache-Control.
+    """
+    entry = scraper.results.entry(filename)
+    if entry is None or not entry['data']:
+        return jsonify({'error': 'No data found'}), 404
+    
+    encoding = next((e for e in ENCODINGS if request.accept_encodings[e]), None)
+    # Each representation gets its own strong ETag
+    etag = f"{entry['etag']}-{encoding}" if encoding else entry['etag']
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif encoding:
+        response = Response(scraper.results.encoded(entry, encoding), mimetype='application/json')
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = Response(entry['body'], mimetype='application/json')
+    
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Query parameters that switch /api/<site> from the whole document to a query
+QUERY_PARAMS = {'page', 'limit', 'cursor', 'q', 'fields', *FILTER_FIELDS}
+MAX_LIMIT = 500
+
+def query_response(filename):
+    """Filtered, paginated and projected items of a results/ file.
+
+    Filters (day, genre, source_page, q) are answered from the indexes built
+    once per result version; pagination uses page/limit or the returned cursor.
+    """
+    entry = scraper.results.entry(filename)
+    if entry is None or not entry['data']:
+        return jsonify({'error': 'No data found'}), 404
+    
+    limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_LIMIT)
+    page = max(request.args.get('page', 1, type=int), 1)
+    cursor = request.args.get('cursor', None, type=int)
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+    filters = {field: request.args[field] for field in FILTER_FIELDS if request.args.get(field)}
+    
+    # Same result version and same query: nothing to send again
+    etag = hashlib.sha256(f"{entry['etag']}?{request.query_string.decode()}".encode('utf-8')).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        index = scraper.results.index(entry)
+        positions = index.search(filters, request.args.get('q'))
+        items, next_cursor = index.page(positions, limit, (page - 1) * limit, cursor)
+        data = entry['data']
+        response = jsonify({
+            'site': data.get('site'),
+            'timestamp': data.get('timestamp'),
+            'total': len(positions),
+            'count': len(items),
+            'limit': limit,
+            'page': None if cursor is not None else page,
+            'next_cursor': next_cursor,
+            'data': index.project(items, fields)
+        })
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.template_global()
+def thumb(url):
+    """Local thumbnail URL for a poster, or the original URL until it is cached"""
+    filename = scraper.thumbnails.lookup(url)
+    return url_for('thumbnail', filename=filename) if filename else url
+
+@app.route('/thumb/<filename>')
+def thumbnail(filename):
+    """Serve a cached poster; names are content hashes, so they never change"""
+    scraper.thumbnails.touch(filename)
+    response = send_from_directory(os.path.abspath(scraper.thumbnails.cache_dir), filename, max_age=365 * 24 * 3600)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 @app.route('/')
 def index():
     """Home page"""
     return render_template('index.html')
 
-@app.route('/scrape-all')
+def job_response(job, created):
+    """202 with the job record and where to poll it"""
+    body = dict(job, coalesced=not created, status_url=url_for('job_status', job_id=job['id']))
+    return jsonify(body), 202
+
+@app.route('/scrape-all', methods=['GET', 'POST'])
 def scrape_all():
-    """Scrape both websites in parallel"""
-    try:
-        pages = request.args.get('pages', 2, type=int)
-        result = scraper.scrape_parallel(max_pages_per_site=pages)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    """Queue a parallel scrape of all websites"""
+    pages = request.args.get('pages', 2, type=int)
+    workers = request.args.get('workers', None, type=int)
+    incremental = request.args.get('incremental') == '1'
+    resume = request.args.get('resume') == '1'
+    if request.args.get('engine') == 'async':
+        concurrency = max(request.args.get('concurrency', 100, type=int), 1)
+        job, created = jobs.submit(('all', 'async', pages, concurrency, incremental, resume),
+                                   f'Scrape semua situs ({pages} hal, async)',
+                                   scraper.scrape_async, max_pages=pages, concurrency=concurrency,
+                                   incremental=incremental, resume=resume)
+    else:
+        job, created = jobs.submit(('all', 'threads', pages, workers, incremental, resume),
+                                   f'Scrape semua situs ({pages} hal)',
+                                   scraper.scrape_parallel, max_pages_per_site=pages, page_workers=workers,
+                                   incremental=incremental, resume=resume)
+    return job_response(job, created)
 
-@app.route('/scrape-otakudesu')
-def scrape_otakudesu():
-    """Scrape OtakuDesu only"""
-    try:
-        pages = request.args.get('pages', 2, type=int)
-        result = scraper.scrape_otakudesu(max_pages=pages)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+@app.route('/scrape-<site_name>', methods=['GET', 'POST'])
+def scrape_site(site_name):
+    """Queue a scrape of one registered site"""
+    if site_name not in scraper.sites:
+        return jsonify({'error': 'Unknown site'}), 404
+    pages = request.args.get('pages', 2, type=int)
+    workers = request.args.get('workers', None, type=int)
+    incremental = request.args.get('incremental') == '1'
+    resume = request.args.get('resume') == '1'
+    stream_only = request.args.get('stream_only') == '1'
+    if stream_only and incremental:
+        return jsonify({'error': 'stream_only cannot be combined with incremental'}), 400
+    job, created = jobs.submit(('site', site_name, pages, workers, incremental, resume, stream_only),
+                               f'Scrape {site_name} ({pages} hal)',
+                               scraper.scrape_site, site_name, max_pages=pages, page_workers=workers,
+                               incremental=incremental, resume=resume, stream_only=stream_only)
+    return job_response(job, created)
 
-@app.route('/scrape-kusonime')
-def scrape_kusonime():
-    """Scrape Kusonime only"""
-    try:
-        pages = request.args.get('pages', 2, type=int)
-        result = scraper.scrape_kusonime(max_pages=pages)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+@app.route('/crawl-details-<site_name>', methods=['GET', 'POST'])
+def crawl_details(site_name):
+    """Queue a detail-page crawl for the listed items of one site"""
+    if site_name not in scraper.sites:
+        return jsonify({'error': 'Unknown site'}), 404
+    limit = request.args.get('limit', None, type=int)
+    workers = request.args.get('workers', 4, type=int)
+    job, created = jobs.submit(('details', site_name, limit, workers), f'Crawl detail {site_name}',
+                               scraper.crawl_details, site_name, max_items=limit, workers=workers)
+    return job_response(job, created)
 
-@app.route('/otakudesu')
-def view_otakudesu():
-    """View OtakuDesu results"""
-    data = load_json('otakudesu.json')
-    return render_template('otakudesu.html', data=data)
+@app.route('/jobs')
+def list_jobs():
+    """Recent scrape jobs, newest first"""
+    return jsonify(jobs.list(limit=request.args.get('limit', 20, type=int)))
 
-@app.route('/kusonime')
-def view_kusonime():
-    """View Kusonime results"""
-    data = load_json('kusonime.json')
-    return render_template('kusonime.html', data=data)
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status of one scrape job, with its result once done"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+@app.route('/scheduler')
+def scheduler_status():
+    """Per-site re-scrape intervals and next run times"""
+    return jsonify(scheduler.status())
+
+@app.route('/rate-limits')
+def rate_limits():
+    """Current rate, concurrency window and latency of each host's limiter"""
+    return jsonify(scraper.rate_limiter.status())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of scraper timings and counters"""
+    return Response(scraper.metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/events')
+def progress_events():
+    """Server-Sent Events stream of scrape progress (pages, sites, jobs)"""
+    last_event_id = request.headers.get('Last-Event-ID', None, type=int)
+    subscriber = scraper.progress.subscribe(last_event_id)
+    
+    def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            scraper.progress.unsubscribe(subscriber)
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/retry-page/<site>/<int:page>', methods=['GET', 'POST'])
+def retry_page(site, page):
+    """Queue a re-scrape of a single page of a site"""
+    if site not in scraper.sites:
+        return jsonify({'error': 'Unknown site'}), 404
+    if not os.path.exists(os.path.join(scraper.results_dir, f'{site}.json')):
+        return jsonify({'error': 'No data found'}), 404
+    job, created = jobs.submit(('retry', site, page), f'Scrape ulang {site} halaman {page}',
+                               scraper.retry_page, site, page)
+    return job_response(job, created)
 
 @app.route('/comparison')
 def comparison():
@@ -89,29 +268,55 @@ def view_merged():
     merged = load_json('merged.json')
     return render_template('merged.html', data=merged)
 
-@app.route('/api/otakudesu')
-def api_otakudesu():
-    """API endpoint for OtakuDesu JSON"""
-    data = load_json('otakudesu.json')
-    if data:
-        return jsonify(data)
-    return jsonify({'error': 'No data found'}), 404
-
-@app.route('/api/kusonime')
-def api_kusonime():
-    """API endpoint for Kusonime JSON"""
-    data = load_json('kusonime.json')
-    if data:
-        return jsonify(data)
-    return jsonify({'error': 'No data found'}), 404
+@app.route('/api/<site_name>')
+def api_site(site_name):
+    """API endpoint for a registered site's JSON"""
+    if site_name not in scraper.sites:
+        return jsonify({'error': 'Unknown site'}), 404
+    if QUERY_PARAMS.intersection(request.args):
+        return query_response(f'{site_name}.json')
+    return json_file_response(f'{site_name}.json')
+
+@app.route('/api/<site_name>.ndjson')
+def api_site_ndjson(site_name):
+    """A site's items as NDJSON (one item per line), streamed from disk"""
+    if site_name not in scraper.sites:
+        return jsonify({'error': 'Unknown site'}), 404
+    results_dir = os.path.abspath(scraper.results_dir)
+    filename = f'{site_name}.ndjson'
+    if not os.path.exists(os.path.join(results_dir, filename)):
+        return jsonify({'error': 'No data found'}), 404
+    response = send_from_directory(results_dir, filename, mimetype='application/x-ndjson', max_age=0)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/<site_name>/details')
+def api_site_details(site_name):
+    """Detail pages crawled for a site; ?link= returns a single item's detail"""
+    if site_name not in scraper.sites:
+        return jsonify({'error': 'Unknown site'}), 404
+    link = request.args.get('link')
+    if link is None:
+        return json_file_response(f'{site_name}_details.json')
+    data = load_json(f'{site_name}_details.json')
+    detail = data.get('details', {}).get(link) if data else None
+    if detail is None:
+        return jsonify({'error': 'No data found'}), 404
+    return jsonify(detail)
 
 @app.route('/api/merged')
 def api_merged():
     """API endpoint for merged JSON"""
-    data = load_json('merged.json')
-    if data:
-        return jsonify(data)
-    return jsonify({'error': 'No data found'}), 404
+    return json_file_response('merged.json')
+
+@app.route('/<site_name>')
+def view_site(site_name):
+    """View a registered site's results"""
+    adapter = scraper.sites.get(site_name)
+    if adapter is None or adapter.template is None:
+        abort(404)
+    data = load_json(f'{site_name}.json')
+    return render_template(adapter.template, data=data)
 
 # Admin routes
 @app.route('/admin/login', methods=['GET', 'POST'])
@@ -139,10 +344,15 @@ def admin_logout():
 @login_required
 def admin_dashboard():
     """Admin dashboard"""
-    # Get all history
-    all_history = scraper.get_history(limit=50)
+    per_page = 20
+    page = max(request.args.get('page', 1, type=int), 1)
+    
+    # History summaries come from the indexed history store
+    history = scraper.get_history(limit=per_page, offset=(page - 1) * per_page)
     otaku_history = scraper.get_history('otakudesu', limit=10)
     kuso_history = scraper.get_history('kusonime', limit=10)
+    total_scrapes = scraper.count_history()
+    last_scrape = scraper.history.last_timestamp()
     
     # Get current data
     otakudesu = load_json('otakudesu.json')
@@ -150,36 +360,37 @@ def admin_dashboard():
     merged = load_json('merged.json')
     
     stats = {
-        'total_scrapes': len(all_history),
+        'total_scrapes': total_scrapes,
         'otakudesu_count': otakudesu.get('count', 0) if otakudesu else 0,
         'kusonime_count': kusonime.get('count', 0) if kusonime else 0,
         'merged_matches': len(merged.get('matches', [])) if merged else 0,
-        'last_scrape': all_history[0]['timestamp'] if all_history else 'Never'
+        'last_scrape': last_scrape or 'Never'
     }
     
     return render_template('admin_dashboard.html', 
                          stats=stats, 
-                         history=all_history[:20],
+                         history=history,
                          otaku_history=otaku_history,
-                         kuso_history=kuso_history)
+                         kuso_history=kuso_history,
+                         page=page,
+                         has_next=page * per_page < total_scrapes)
 
 @app.route('/admin/history/<filename>')
 @login_required
 def view_history_file(filename):
-    """View specific history file"""
-    try:
-        with open(f'history/{filename}', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return jsonify(data)
-    except FileNotFoundError:
+    """View specific history snapshot"""
+    data = scraper.get_history_snapshot(filename)
+    if data is None:
         return jsonify({'error': 'File not found'}), 404
+    return jsonify(data)
 
 @app.route('/admin/delete-history/<filename>', methods=['POST'])
 @login_required
 def delete_history_file(filename):
-    """Delete specific history file"""
+    """Delete specific history snapshot"""
     try:
-        os.remove(f'history/{filename}')
+        if not scraper.delete_history(filename):
+            return jsonify({'success': False, 'error': 'File not found'}), 404
         return jsonify({'success': True, 'message': 'File deleted'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -187,14 +398,15 @@ def delete_history_file(filename):
 @app.route('/admin/clear-history', methods=['POST'])
 @login_required
 def clear_history():
-    """Clear all history files"""
+    """Clear all history snapshots"""
     try:
-        for filename in os.listdir('history'):
-            if filename.endswith('.json'):
-                os.remove(f'history/{filename}')
+        scraper.clear_history()
         return jsonify({'success': True, 'message': 'All history cleared'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 if __name__ == '__main__':
+    # The debug reloader runs this file twice; only the serving process schedules scrapes
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' and os.environ.get('SCRAPER_SCHEDULER', '1') != '0':
+        scheduler.start()
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,41 @@
+import os
+import threading
+
+
+def fsync_dir(directory):
+    """Flush a directory entry change (rename) to disk; a no-op where unsupported"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory or '.', os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def replace_file(tmp_path, path):
+    """Atomically swap a fully written and synced tmp_path in as path"""
+    os.replace(tmp_path, path)
+    fsync_dir(os.path.dirname(path))
+
+
+def write_atomic(path, data):
+    """Write bytes to path so readers and crashes see the old or the new file, never a mix.
+
+    The data goes to a temporary file in the same directory, is fsynced, and
+    is renamed over path; the directory is then fsynced so the rename itself
+    survives a crash.
+    """
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        replace_file(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,382 @@
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scraper import AnimeScraper
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+FIXTURES_DIR = 'fixtures'
+
+# (parser, extractor) combinations compared by the parse benchmark
+PARSE_BACKENDS = [
+    ('html.parser', 'soup'),
+    ('lxml', 'soup'),
+    ('lxml', 'xpath'),
+]
+
+
+# Scrape paths compared by the crawl benchmark
+CRAWL_MODES = ['sync', 'parallel', 'async', 'details']
+
+
+def fixture_path(site_name, page):
+    return os.path.join(FIXTURES_DIR, f'{site_name}_page{page}.html')
+
+
+def detail_fixture_path(site_name, number):
+    return os.path.join(FIXTURES_DIR, f'{site_name}_detail{number}.html')
+
+
+def record_fixtures(max_pages=3, max_details=5):
+    """Save live listing pages and the first detail pages of every site as HTML fixtures"""
+    scraper = AnimeScraper(use_cache=False)
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+
+    for site_name, adapter in scraper.sites.items():
+        first_items = []
+        for page in range(1, max_pages + 1):
+            url = adapter.page_url(page)
+            print(f"[{adapter.label}] Recording {url}")
+            response = scraper.fetch_page(url)
+            with open(fixture_path(site_name, page), 'wb') as f:
+                f.write(response.content)
+            if page == 1:
+                first_items = scraper._parse_page(adapter, response.content, page)
+
+        links = [anime['link'] for anime in first_items if anime.get('link', 'N/A') != 'N/A']
+        for number, url in enumerate(links[:max_details], start=1):
+            print(f"[{adapter.label}] Recording detail {url}")
+            response = scraper.fetch_page(url)
+            with open(detail_fixture_path(site_name, number), 'wb') as f:
+                f.write(response.content)
+
+
+def load_fixtures():
+    """Load recorded fixtures as {site_name: [(page, content), ...]}"""
+    fixtures = {}
+    if not os.path.isdir(FIXTURES_DIR):
+        return fixtures
+
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if not filename.endswith('.html') or '_page' not in filename:
+            continue
+        site_name, page = filename[:-len('.html')].rsplit('_page', 1)
+        with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+            fixtures.setdefault(site_name, []).append((int(page), f.read()))
+    return fixtures
+
+
+def load_detail_fixtures():
+    """Load recorded detail pages as {site_name: [content, ...]}"""
+    details = {}
+    if not os.path.isdir(FIXTURES_DIR):
+        return details
+
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        found = re.fullmatch(r'(.+)_detail(\d+)\.html', filename)
+        if found:
+            with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+                details.setdefault(found.group(1), []).append(f.read())
+    return details
+
+
+class StandInServer:
+    """Local HTTP stand-in for a live site, serving recorded fixtures.
+
+    The crawl benchmark starts one per site, each on its own port, so every
+    site is a separate host to the rate limiter and the per-site metrics.
+    /<site>/ and /<site>/page/<n>/ serve the listing fixtures in rotation up to
+    `pages` pages (404 after that), /<site>/detail/<n> serves detail fixtures.
+    Every response waits `latency` seconds, and `error_rate` of them are 503s
+    so the retry path is exercised too.
+    """
+
+    def __init__(self, fixtures, details, pages=20, latency=0.05, error_rate=0.0):
+        self.fixtures = fixtures
+        self.details = details
+        self.pages = pages
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.httpd = None
+
+    def body(self, path):
+        found = re.fullmatch(r'/([^/]+)/(?:page/(\d+)/|detail/(\d+))?', path)
+        if not found:
+            return None
+        site_name, page, detail = found.groups()
+        if detail is not None:
+            contents = self.details.get(site_name)
+            return contents[int(detail) % len(contents)] if contents else None
+        pages = self.fixtures.get(site_name)
+        page = int(page or 1)
+        if not pages or page > self.pages:
+            return None
+        return pages[(page - 1) % len(pages)][1]
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests += 1
+                time.sleep(stand_in.latency)
+                if random.random() < stand_in.error_rate:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = stand_in.body(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_crawl(scraper, mode, sites, pages, site_urls):
+    """Run one scrape path; returns the number of items it produced"""
+    if mode == 'sync':
+        return sum(scraper.scrape_site(site_name, pages, page_workers=1)['count'] for site_name in sites)
+    if mode == 'parallel':
+        result = scraper.scrape_parallel(max_pages_per_site=pages, page_workers=4, sites=sites)
+        return sum(r.get('count', 0) for r in result['results'])
+    if mode == 'async':
+        result = scraper.scrape_async(sites=sites, max_pages=pages)
+        return sum(r.get('count', 0) for r in result['results'])
+
+    # details: list page 1, point every item at a stand-in detail page, crawl them
+    items = 0
+    for site_name in sites:
+        result = scraper.scrape_site(site_name, 1)
+        for number, anime in enumerate(result['data']):
+            anime['link'] = f'{site_urls[site_name]}/{site_name}/detail/{number}'
+        scraper._write_result(f'{site_name}.json', result)
+        summary = scraper.crawl_details(site_name, workers=4)
+        items += summary['fetched'] if summary else 0
+    return items
+
+
+def _measure_crawl(mode, sites, pages, site_urls, request_delay):
+    """Run one mode in a temporary directory and measure it.
+
+    Runs in a fresh worker process (see benchmark_crawl), so peak RSS belongs
+    to this mode alone.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        scraper = AnimeScraper(request_delay=request_delay, use_cache=False, backoff_factor=0.05)
+        for site_name in sites:
+            scraper.sites[site_name].base_url = f'{site_urls[site_name]}/{site_name}/'
+
+        # Parse CPU time is summed per thread around the parser
+        parse_cpu = []
+        parse_page = scraper._parse_page
+
+        def timed_parse(adapter, content, page):
+            started = time.thread_time()
+            try:
+                return parse_page(adapter, content, page)
+            finally:
+                parse_cpu.append(time.thread_time() - started)
+        scraper._parse_page = timed_parse
+
+        # Detail fetches publish no page events, so they are timed directly
+        detail_latencies = []
+        fetch_detail = scraper._fetch_detail
+
+        def timed_detail(adapter, detail_url):
+            started = time.perf_counter()
+            try:
+                return fetch_detail(adapter, detail_url)
+            finally:
+                detail_latencies.append(time.perf_counter() - started)
+        scraper._fetch_detail = timed_detail
+
+        events = scraper.progress.subscribe()
+        start_time = time.perf_counter()
+        try:
+            items = _run_crawl(scraper, mode, sites, pages, site_urls)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            os.chdir(cwd)
+
+    latencies = []
+    while not events.empty():
+        event = events.get()
+        if event['type'] == 'page_finished' and event['count']:
+            latencies.append(event['latency'])
+    if mode == 'details':
+        latencies = detail_latencies
+    return {
+        'items': items,
+        'seconds': elapsed,
+        'latencies': latencies,
+        'peak_rss_mb': _peak_rss_mb(),
+        'parse_cpu': sum(parse_cpu)
+    }
+
+
+def benchmark_crawl(modes=None, pages=20, latency=0.05, error_rate=0.0, request_delay=0.0):
+    """Run the scrape paths against local stand-in servers and report throughput.
+
+    Reports pages/s, items/s, p50/p99 page latency (from the scraper's progress
+    events), peak RSS of the mode and CPU time spent parsing. Every mode runs
+    in its own spawned process; results, history and caches go to a
+    temporary directory.
+    """
+    fixtures = load_fixtures()
+    if not fixtures:
+        print(f"No fixtures in '{FIXTURES_DIR}/'. Run: python benchmark.py record")
+        return []
+    details = load_detail_fixtures()
+    modes = modes or CRAWL_MODES
+
+    stand_ins = {site_name: StandInServer(fixtures, details, pages, latency, error_rate)
+                 for site_name in fixtures}
+    site_urls = {site_name: stand_in.start() for site_name, stand_in in stand_ins.items()}
+    context = multiprocessing.get_context('spawn')
+    results = []
+    try:
+        for mode in modes:
+            sites = [site_name for site_name in fixtures if mode != 'details' or site_name in details]
+            requests_before = {site_name: stand_ins[site_name].requests for site_name in sites}
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                measured = pool.submit(_measure_crawl, mode, sites, pages, site_urls,
+                                       request_delay).result()
+            elapsed = measured['seconds']
+            latencies = measured['latencies']
+            fetched = len(latencies)
+            results.append({
+                'mode': mode,
+                'pages': fetched,
+                'items': measured['items'],
+                'requests': sum(stand_ins[site_name].requests - requests_before[site_name]
+                                for site_name in sites),
+                'seconds': elapsed,
+                'pages_per_second': fetched / elapsed if elapsed else 0,
+                'items_per_second': measured['items'] / elapsed if elapsed else 0,
+                'p50_latency': _percentile(latencies, 0.5),
+                'p99_latency': _percentile(latencies, 0.99),
+                'peak_rss_mb': measured['peak_rss_mb'],
+                'parse_cpu': measured['parse_cpu']
+            })
+    finally:
+        for stand_in in stand_ins.values():
+            stand_in.stop()
+
+    print(f"{'mode':<10}{'pages':>7}{'items':>8}{'reqs':>7}{'seconds':>9}{'pages/s':>9}{'items/s':>9}"
+          f"{'p50 ms':>8}{'p99 ms':>8}{'rss MB':>8}{'parse s':>9}")
+    for r in results:
+        rss = f"{r['peak_rss_mb']:>8.1f}" if r['peak_rss_mb'] is not None else f"{'-':>8}"
+        print(f"{r['mode']:<10}{r['pages']:>7}{r['items']:>8}{r['requests']:>7}{r['seconds']:>9.2f}"
+              f"{r['pages_per_second']:>9.1f}{r['items_per_second']:>9.0f}"
+              f"{r['p50_latency'] * 1000:>8.0f}{r['p99_latency'] * 1000:>8.0f}{rss}{r['parse_cpu']:>9.3f}")
+    return results
+
+
+def benchmark_parse(rounds=20):
+    """Measure items parsed per second for every parser backend"""
+    fixtures = load_fixtures()
+    if not fixtures:
+        print(f"No fixtures in '{FIXTURES_DIR}/'. Run: python benchmark.py record")
+        return []
+
+    results = []
+    for parser, extractor in PARSE_BACKENDS:
+        scraper = AnimeScraper(parser=parser, extractor=extractor, use_cache=False)
+
+        for site_name, pages in fixtures.items():
+            adapter = scraper.sites.get(site_name)
+            if adapter is None:
+                continue
+            items = 0
+            start_time = time.perf_counter()
+            for _ in range(rounds):
+                for page, content in pages:
+                    items += len(scraper._parse_page(adapter, content, page))
+            elapsed = time.perf_counter() - start_time
+
+            results.append({
+                'site': site_name,
+                'parser': parser,
+                'extractor': extractor,
+                'pages': len(pages) * rounds,
+                'items': items,
+                'seconds': elapsed,
+                'items_per_second': items / elapsed if elapsed else 0
+            })
+
+    print(f"{'site':<12}{'parser':<13}{'extractor':<11}{'items':>8}{'seconds':>10}{'items/s':>12}")
+    for r in results:
+        print(f"{r['site']:<12}{r['parser']:<13}{r['extractor']:<11}{r['items']:>8}"
+              f"{r['seconds']:>10.3f}{r['items_per_second']:>12.0f}")
+    return results
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Offline scraper benchmarks')
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='record live listing and detail pages as fixtures')
+    record.add_argument('--pages', type=int, default=3)
+    record.add_argument('--details', type=int, default=5)
+
+    parse = commands.add_parser('parse', help='items/s per parser backend on fixtures')
+    parse.add_argument('--rounds', type=int, default=20)
+
+    crawl = commands.add_parser('crawl', help='scrape paths against a local stand-in server')
+    crawl.add_argument('--modes', nargs='+', choices=CRAWL_MODES, default=CRAWL_MODES)
+    crawl.add_argument('--pages', type=int, default=20, help='pages served per site')
+    crawl.add_argument('--latency', type=float, default=0.05, help='seconds per response')
+    crawl.add_argument('--error-rate', type=float, default=0.0, help='share of 503 responses')
+    crawl.add_argument('--delay', type=float, default=0.0, help='scraper request_delay')
+
+    args = arg_parser.parse_args()
+    if args.command == 'record':
+        record_fixtures(args.pages, args.details)
+    elif args.command == 'parse':
+        benchmark_parse(args.rounds)
+    elif args.command == 'crawl':
+        benchmark_crawl(args.modes, args.pages, args.latency, args.error_rate, args.delay)
@@ -0,0 +1,65 @@
+import json
+import os
+import threading
+import time
+
+
+class CrawlCheckpoint:
+    """Per-page progress of one site's crawl, appended to an NDJSON file.
+
+    Every finished listing page adds one line {"page": n, "at": time,
+    "items": [...]} that is fsynced before the crawl moves on, so the file
+    survives a crash or restart up to the last completed page. A resumed
+    crawl reuses these pages instead of fetching them again; pages that
+    failed were never recorded and are fetched. A torn last line (crash
+    mid-write) is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self, max_age=None):
+        """Recorded pages as {page: items} (empty without a checkpoint).
+
+        Pages recorded more than max_age seconds ago are left out; the
+        listing has moved on since, so they are fetched again.
+        """
+        now = time.time()
+        pages = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if max_age is not None and now - record.get('at', 0) > max_age:
+                        continue
+                    pages[record['page']] = record['items']
+        except FileNotFoundError:
+            pass
+        return pages
+
+    def record(self, page, items):
+        """Append one finished page and flush it to disk"""
+        line = json.dumps({'page': page, 'at': time.time(), 'items': items}, ensure_ascii=False,
+                          separators=(',', ':')) + '\n'
+        with self._lock:
+            with open(self.path, 'a+b') as f:
+                # After a torn write, start on a fresh line so this record stays readable
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        line = '\n' + line
+                f.write(line.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self):
+        """Forget all progress (the crawl completed or starts over)"""
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,35 @@
+import threading
+from collections import deque
+
+
+class Frontier:
+    """Thread-safe FIFO of URLs to crawl, each URL accepted at most once.
+
+    add() ignores URLs that were already queued or handed out, so item lists
+    with repeated links (or links discovered again while crawling) never cause
+    a second fetch. Each URL carries a version that the crawler stores with
+    what it fetched.
+    """
+
+    def __init__(self):
+        self.queue = deque()
+        self.seen = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self.queue)
+
+    def add(self, url, version=None):
+        """Queue url; returns False if it was seen before"""
+        with self._lock:
+            if url in self.seen:
+                return False
+            self.seen.add(url)
+            self.queue.append((url, version))
+            return True
+
+    def pop(self):
+        """Next (url, version), or None when the frontier is empty"""
+        with self._lock:
+            return self.queue.popleft() if self.queue else None
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL UNIQUE,
+    site_key TEXT NOT NULL,
+    site TEXT,
+    timestamp TEXT,
+    count INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    execution_time REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON snapshots (timestamp);
+CREATE INDEX IF NOT EXISTS idx_snapshots_site_timestamp ON snapshots (site_key, timestamp);
+CREATE TABLE IF NOT EXISTS snapshot_documents (
+    snapshot_id INTEGER PRIMARY KEY REFERENCES snapshots (id) ON DELETE CASCADE,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    hash TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS manifest_items (
+    manifest_hash TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    record_hash TEXT NOT NULL,
+    PRIMARY KEY (manifest_hash, position)
+);
+CREATE INDEX IF NOT EXISTS idx_manifest_items_record ON manifest_items (record_hash);
+"""
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+SUMMARY_COLUMNS = 'filename, site, timestamp, count, success, execution_time'
+
+
+class HistoryStore:
+    """SQLite store for scrape history snapshots.
+
+    Summary fields live in an indexed snapshots table so listing, site
+    filtering, pagination and "last scrape" lookups never touch the stored
+    documents. Snapshot data is content-addressed: every distinct anime record
+    is stored once under its hash, a run's item list is a manifest of record
+    hashes (itself stored once per distinct list), and each snapshot keeps
+    only its metadata plus the manifest hash. Full results are rebuilt on
+    demand when one snapshot is opened.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = [row['name'] for row in conn.execute('PRAGMA table_info(snapshot_documents)')]
+            if 'manifest_hash' not in columns:
+                # Documents written before deduplication keep their data inline
+                conn.execute('ALTER TABLE snapshot_documents ADD COLUMN manifest_hash TEXT')
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection, commit on success and always close it"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _summary(row):
+        return {
+            'filename': row['filename'],
+            'site': row['site'] or 'Unknown',
+            'timestamp': row['timestamp'],
+            'count': row['count'],
+            'success': bool(row['success']),
+            'execution_time': row['execution_time']
+        }
+
+    def add(self, site_key, filename, result):
+        """Store a site result under filename; returns the filename actually used"""
+        base, ext = os.path.splitext(filename)
+        meta = {key: value for key, value in result.items() if key != 'data'}
+        records = [json.dumps(anime, ensure_ascii=False, sort_keys=True)
+                   for anime in result.get('data', [])]
+        record_hashes = [content_hash(record) for record in records]
+        manifest_hash = content_hash(''.join(record_hashes))
+
+        with self._lock, self._connect() as conn:
+            # Two runs within the same second would share a name
+            candidate = filename
+            if conn.execute('SELECT 1 FROM snapshots WHERE filename = ?', (candidate,)).fetchone():
+                suffix = conn.execute('SELECT COUNT(*) FROM snapshots WHERE filename GLOB ?',
+                                      (f'{base}_*{ext}',)).fetchone()[0] + 1
+                candidate = f'{base}_{suffix}{ext}'
+                while conn.execute('SELECT 1 FROM snapshots WHERE filename = ?', (candidate,)).fetchone():
+                    suffix += 1
+                    candidate = f'{base}_{suffix}{ext}'
+
+            cursor = conn.execute(
+                'INSERT INTO snapshots (filename, site_key, site, timestamp, count, success, execution_time) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (candidate, site_key, result.get('site', 'Unknown'), result.get('timestamp'),
+                 result.get('count', 0), int(bool(result.get('success', False))),
+                 result.get('execution_time', 0) or 0))
+            conn.execute('INSERT INTO snapshot_documents (snapshot_id, body, manifest_hash) VALUES (?, ?, ?)',
+                         (cursor.lastrowid, json.dumps(meta, ensure_ascii=False), manifest_hash))
+            
+            # An identical item list was stored by an earlier run: nothing else to write
+            if not conn.execute('SELECT 1 FROM manifest_items WHERE manifest_hash = ? LIMIT 1',
+                                (manifest_hash,)).fetchone():
+                conn.executemany('INSERT OR IGNORE INTO records (hash, body) VALUES (?, ?)',
+                                 zip(record_hashes, records))
+                conn.executemany(
+                    'INSERT INTO manifest_items (manifest_hash, position, record_hash) VALUES (?, ?, ?)',
+                    ((manifest_hash, position, record_hash)
+                     for position, record_hash in enumerate(record_hashes)))
+        return candidate
+
+    def list(self, site_key=None, limit=10, offset=0):
+        """Newest-first snapshot summaries, optionally for one site"""
+        with self._connect() as conn:
+            if site_key:
+                rows = conn.execute(
+                    f'SELECT {SUMMARY_COLUMNS} FROM snapshots WHERE site_key = ? '
+                    'ORDER BY timestamp DESC LIMIT ? OFFSET ?', (site_key, limit, offset))
+            else:
+                rows = conn.execute(
+                    f'SELECT {SUMMARY_COLUMNS} FROM snapshots '
+                    'ORDER BY timestamp DESC LIMIT ? OFFSET ?', (limit, offset))
+            return [self._summary(row) for row in rows]
+
+    def count(self, site_key=None):
+        with self._connect() as conn:
+            if site_key:
+                row = conn.execute('SELECT COUNT(*) FROM snapshots WHERE site_key = ?', (site_key,))
+            else:
+                row = conn.execute('SELECT COUNT(*) FROM snapshots')
+            return row.fetchone()[0]
+
+    def last_timestamp(self, site_key=None):
+        """Timestamp of the newest snapshot (None if there is none)"""
+        latest = self.list(site_key, limit=1)
+        return latest[0]['timestamp'] if latest else None
+
+    def recent_manifests(self, site_key, limit=10):
+        """Manifest hashes of a site's newest successful snapshots, newest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT d.manifest_hash FROM snapshots s JOIN snapshot_documents d ON d.snapshot_id = s.id '
+                'WHERE s.site_key = ? AND s.success = 1 ORDER BY s.timestamp DESC LIMIT ?',
+                (site_key, limit))
+            return [row['manifest_hash'] for row in rows]
+
+    def get(self, filename):
+        """Full stored result of one snapshot, rebuilt from its manifest (None if unknown)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT d.body, d.manifest_hash FROM snapshots s '
+                'JOIN snapshot_documents d ON d.snapshot_id = s.id '
+                'WHERE s.filename = ?', (filename,)).fetchone()
+            if row is None:
+                return None
+            result = json.loads(row['body'])
+            if row['manifest_hash'] is not None:
+                records = conn.execute(
+                    'SELECT r.body FROM manifest_items m JOIN records r ON r.hash = m.record_hash '
+                    'WHERE m.manifest_hash = ? ORDER BY m.position', (row['manifest_hash'],))
+                result['data'] = [json.loads(record['body']) for record in records]
+        return result
+
+    def contains(self, filename):
+        with self._connect() as conn:
+            return conn.execute('SELECT 1 FROM snapshots WHERE filename = ?',
+                                (filename,)).fetchone() is not None
+
+    def delete(self, filename):
+        """Delete one snapshot; returns True if it existed"""
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute('DELETE FROM snapshots WHERE filename = ?', (filename,))
+            self._collect_garbage(conn)
+            return cursor.rowcount > 0
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM snapshots')
+            self._collect_garbage(conn)
+
+    @staticmethod
+    def _collect_garbage(conn):
+        """Drop manifests and records no snapshot refers to anymore"""
+        conn.execute('DELETE FROM manifest_items WHERE manifest_hash NOT IN '
+                     '(SELECT manifest_hash FROM snapshot_documents WHERE manifest_hash IS NOT NULL)')
+        conn.execute('DELETE FROM records WHERE hash NOT IN (SELECT record_hash FROM manifest_items)')
+
+    def import_json_files(self, history_dir):
+        """Import legacy history/<site>_<timestamp>.json files not stored yet"""
+        imported = 0
+        for filename in sorted(os.listdir(history_dir)):
+            if not filename.endswith('.json') or self.contains(filename):
+                continue
+            with open(os.path.join(history_dir, filename), 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            site_key = filename.split('_', 1)[0]
+            self.add(site_key, filename, result)
+            imported += 1
+        return imported
@@ -0,0 +1,111 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueue:
+    """Background scrape jobs run by a bounded worker pool.
+
+    submit() returns immediately with a job record. Jobs are identified by a
+    key describing what they do (e.g. ('site', 'otakudesu', 2)); submitting a
+    key that is already queued or running returns the in-flight job instead of
+    starting a second crawl. Finished jobs are kept, oldest dropped first,
+    until max_finished is reached. A job keeps a summary of its return value
+    without item lists (see _summary), so finished jobs do not pin whole
+    catalogs in memory. With a progress broker, job state changes are
+    published as job_* events.
+    """
+
+    def __init__(self, max_workers=2, max_finished=100, progress=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        self.active = {}
+        self.progress = progress
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _summary(result):
+        """Copy of a job's return value without 'data' item lists, at any depth"""
+        if isinstance(result, dict):
+            return {key: JobQueue._summary(value) for key, value in result.items() if key != 'data'}
+        if isinstance(result, list):
+            return [JobQueue._summary(value) for value in result]
+        return result
+
+    @staticmethod
+    def _public(job):
+        return {key: value for key, value in job.items() if key != 'key'}
+
+    def _publish(self, event_type, job):
+        if self.progress is not None:
+            self.progress.publish(event_type, job_id=job['id'], description=job['description'],
+                                  status=job['status'], error=job['error'])
+
+    def submit(self, key, description, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) unless an identical job is in flight.
+
+        Returns (job, created) where created is False for a coalesced request.
+        """
+        with self._lock:
+            job_id = self.active.get(key)
+            if job_id is not None:
+                return self._public(self.jobs[job_id]), False
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'key': key,
+                'description': description,
+                'status': 'queued',
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            self.jobs[job['id']] = job
+            self.active[key] = job['id']
+            self._trim()
+
+        self._publish('job_queued', job)
+        self.executor.submit(self._run, job, fn, args, kwargs)
+        return self._public(job), True
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+        self._publish('job_started', job)
+        try:
+            result = self._summary(fn(*args, **kwargs))
+            status, error = 'done', None
+        except Exception as e:
+            result, status, error = None, 'failed', str(e)
+
+        with self._lock:
+            job['result'] = result
+            job['error'] = error
+            job['status'] = status
+            job['finished_at'] = time.time()
+            self.active.pop(job['key'], None)
+        self._publish('job_finished', job)
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job['status'] in ('done', 'failed')]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        """Snapshot of one job (None if unknown or already dropped)"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def list(self, limit=20):
+        """Newest-first job snapshots without their results"""
+        with self._lock:
+            jobs = list(self.jobs.values())[-limit:]
+        return [{key: value for key, value in self._public(job).items() if key != 'result'}
+                for job in reversed(jobs)]
@@ -0,0 +1,103 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the phase histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Counter names summarized per run, without the scraper_ prefix and _total suffix
+RUN_COUNTERS = ('requests', 'bytes_fetched', 'items_parsed', 'parse_errors', 'retries')
+
+
+def _labels_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class Metrics:
+    """Thread-safe counters and per-phase timing histograms for the scraper.
+
+    Phase timings go to the scraper_phase_seconds histogram labelled by site
+    and phase (response, download, delay, backoff, parse, extract, save, merge);
+    counters are labelled by site. render() produces the Prometheus text
+    format, and site_summary() plus diff() turn the running totals into
+    per-run numbers stored with each result.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, phase, seconds, site='all'):
+        key = ('scraper_phase_seconds', (('phase', phase), ('site', site)))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                histogram['buckets'][index] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    @contextmanager
+    def timer(self, phase, site='all'):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - started, site)
+
+    def site_summary(self, site):
+        """Running totals of one site: seconds per phase and the RUN_COUNTERS"""
+        with self._lock:
+            phases = {dict(labels)['phase']: round(histogram['sum'], 6)
+                      for (_, labels), histogram in self.histograms.items()
+                      if dict(labels)['site'] == site}
+            summary = {'phases': phases}
+            for counter in RUN_COUNTERS:
+                summary[counter] = sum(value for (name, labels), value in self.counters.items()
+                                       if name == f'scraper_{counter}_total' and dict(labels).get('site') == site)
+        return summary
+
+    @staticmethod
+    def diff(before, after):
+        """Per-run numbers from two site_summary() snapshots"""
+        phases = {phase: round(seconds - before['phases'].get(phase, 0), 6)
+                  for phase, seconds in after['phases'].items()}
+        result = {'phases': {phase: seconds for phase, seconds in phases.items() if seconds > 0}}
+        for counter in RUN_COUNTERS:
+            result[counter] = after[counter] - before[counter]
+        return result
+
+    def render(self):
+        """Prometheus text exposition of every counter and histogram"""
+        lines = []
+        with self._lock:
+            counter_names = sorted({name for name, _ in self.counters})
+            for name in counter_names:
+                lines.append(f'# TYPE {name} counter')
+                for (counter, labels), value in sorted(self.counters.items()):
+                    if counter == name:
+                        lines.append(f'{name}{_labels_text(labels)} {value}')
+
+            if self.histograms:
+                lines.append('# TYPE scraper_phase_seconds histogram')
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram['buckets']):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels_text(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{name}_bucket{_labels_text(labels + (("le", "+Inf"),))} {histogram["count"]}')
+                lines.append(f'{name}_sum{_labels_text(labels)} {histogram["sum"]:.6f}')
+                lines.append(f'{name}_count{_labels_text(labels)} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,51 @@
+import json
+import os
+import threading
+
+from atomic_files import replace_file
+
+
+class NDJSONWriter:
+    """Streams items to a compact NDJSON file, one JSON object per line.
+
+    Lines are appended to a temporary file next to `path` as pages are
+    parsed, so nothing is serialized as one big document. commit() fsyncs
+    the temporary file and renames it over `path` in one step; readers only
+    ever see the previous complete file or the new one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def write(self, items):
+        """Append items; count is the number of items written so far"""
+        lines = ''.join(json.dumps(item, ensure_ascii=False, separators=(',', ':')) + '\n'
+                        for item in items)
+        with self._lock:
+            self._file.write(lines)
+            self.count += len(items)
+
+    def commit(self):
+        """Sync and close the file, then atomically replace `path` with it"""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            replace_file(self.tmp_path, self.path)
+
+    def abort(self):
+        """Close and delete the temporary file, leaving `path` untouched"""
+        with self._lock:
+            self._file.close()
+            try:
+                os.remove(self.tmp_path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,50 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+
+class ProgressBroker:
+    """Fan-out of structured scrape progress events to live subscribers.
+
+    publish() stamps each event with an increasing id and the current time and
+    hands it to every subscriber queue without blocking; a subscriber that
+    falls more than max_queue events behind loses the overflow rather than
+    slowing the scrape down. The last `history` events are kept so a client
+    reconnecting with its last seen id can catch up.
+    """
+
+    def __init__(self, history=500, max_queue=1000):
+        self.max_queue = max_queue
+        self.recent = deque(maxlen=history)
+        self.subscribers = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, **fields):
+        with self._lock:
+            event = dict(fields, id=next(self._ids), type=event_type, time=time.time())
+            self.recent.append(event)
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                pass
+        return event
+
+    def subscribe(self, last_event_id=None):
+        """Return a queue receiving new events, pre-filled with those after last_event_id"""
+        subscriber = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self.recent:
+                    if event['id'] > last_event_id and not subscriber.full():
+                        subscriber.put_nowait(event)
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self.subscribers.discard(subscriber)
@@ -0,0 +1,223 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Statuses that mean "slow down"
+THROTTLE_STATUSES = {429, 503}
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (seconds or HTTP date); None if absent or invalid"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class HostLimiter:
+    """Token bucket plus AIMD concurrency window for one host.
+
+    A request needs a free concurrency slot and a token; tokens refill at
+    `rate` per second up to `burst`. rate None means no token limit until the
+    host first pushes back, and max_rate None means no ceiling. Until that
+    first push-back the limiter is in slow start: each success widens the
+    window by one and grows the rate by 10%. Afterwards successes grow the
+    window by 1/window and the rate by rate_step (additive increase). A
+    429/503, a connection error or a latency trend well above the baseline
+    halves both (multiplicative decrease), at most once per cooldown; the
+    first decrease of an unlimited host starts from its measured request
+    rate (only the window shrinks while nothing was measured yet). Latency
+    only counts once min_samples responses were seen and it exceeds
+    slow_floor seconds. Retry-After pauses the host.
+    """
+
+    def __init__(self, rate=None, concurrency=2, min_rate=0.2, max_rate=None,
+                 max_concurrency=8, rate_step=0.5, slow_factor=2.0, slow_floor=0.5, min_samples=10):
+        self.rate = rate
+        self.window = float(concurrency)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.rate_step = rate_step
+        self.slow_factor = slow_factor
+        self.slow_floor = slow_floor
+        self.min_samples = min_samples
+        self.burst = max(concurrency, 1)
+        self.tokens = float(self.burst)
+        self.refilled_at = time.monotonic()
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.latency = None
+        self.baseline = None
+        self.samples = 0
+        self.slow_start = True
+        self.decreased_at = 0.0
+        self.throttled = 0
+        # Start times of recent requests, to measure the rate actually achieved
+        self.started = deque(maxlen=50)
+        self._cond = threading.Condition()
+
+    def _measured_rate(self):
+        if len(self.started) >= 2 and self.started[-1] > self.started[0]:
+            return (len(self.started) - 1) / (self.started[-1] - self.started[0])
+        if self.latency:
+            # Little's law: requests in flight / time per request
+            return self.window / self.latency
+        return None
+
+    def _capped(self, rate):
+        return rate if self.max_rate is None else min(rate, self.max_rate)
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    def _try_acquire(self):
+        """Take a slot and a token; returns 0 on success, else seconds to wait"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.window):
+            return 0.05
+        if self.rate is not None:
+            self._refill(now)
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            self.tokens -= 1
+        self.in_flight += 1
+        self.started.append(now)
+        return 0
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return
+                self._cond.wait(wait)
+
+    async def acquire_async(self):
+        while True:
+            with self._cond:
+                wait = self._try_acquire()
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, status=None, latency=None, retry_after=None, error=False):
+        """Free the slot and adapt to the outcome; no status and no error adapts nothing"""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            slow = False
+            if latency is not None:
+                self.samples += 1
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                # Baseline follows improvements at once and degradations slowly
+                if self.baseline is None or self.latency < self.baseline:
+                    self.baseline = self.latency
+                else:
+                    self.baseline = 0.99 * self.baseline + 0.01 * self.latency
+                slow = (self.samples >= self.min_samples
+                        and self.latency > max(self.slow_factor * self.baseline, self.slow_floor))
+
+            if retry_after is not None:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+            if error or status in THROTTLE_STATUSES or slow:
+                cooldown = max(self.latency or 0, 1.0)
+                if now - self.decreased_at >= cooldown:
+                    if self.rate is None and self._measured_rate() is not None:
+                        self.rate = self._capped(self._measured_rate())
+                        self.refilled_at = now
+                    self.window = max(self.window / 2, 1.0)
+                    if self.rate is not None:
+                        self.rate = max(self.rate / 2, self.min_rate)
+                    self.slow_start = False
+                    self.decreased_at = now
+                    self.throttled += 1
+            elif status is not None and status < 400:
+                if self.slow_start:
+                    self.window = min(self.window + 1, self.max_concurrency)
+                    if self.rate is not None:
+                        self.rate = self._capped(self.rate * 1.1)
+                else:
+                    self.window = min(self.window + 1 / self.window, self.max_concurrency)
+                    if self.rate is not None:
+                        self.rate = self._capped(self.rate + self.rate_step)
+            self.burst = max(int(self.window), 1)
+            self._cond.notify_all()
+
+    def status(self):
+        with self._cond:
+            return {
+                'rate': round(self.rate, 3) if self.rate is not None else None,
+                'concurrency': int(self.window),
+                'in_flight': self.in_flight,
+                'latency': self.latency,
+                'baseline': self.baseline,
+                'paused_for': max(self.paused_until - time.monotonic(), 0),
+                'throttled': self.throttled
+            }
+
+
+class RateLimiter:
+    """Per-host HostLimiters shared by every fetch path of the scraper"""
+
+    def __init__(self, **host_defaults):
+        self.host_defaults = host_defaults
+        self.hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostLimiter(**self.host_defaults)
+            return self.hosts[host]
+
+    @contextmanager
+    def slot(self, url):
+        """Hold a request slot for url's host; fill the yielded dict to report the outcome"""
+        limiter = self.host(url)
+        limiter.acquire()
+        feedback = {'status': None, 'latency': None, 'retry_after': None, 'error': False}
+        try:
+            yield feedback
+        except Exception:
+            feedback['error'] = True
+            raise
+        finally:
+            limiter.release(**feedback)
+
+    @asynccontextmanager
+    async def slot_async(self, url):
+        limiter = self.host(url)
+        await limiter.acquire_async()
+        feedback = {'status': None, 'latency': None, 'retry_after': None, 'error': False}
+        try:
+            yield feedback
+        except Exception:
+            feedback['error'] = True
+            raise
+        finally:
+            limiter.release(**feedback)
+
+    def status(self):
+        with self._lock:
+            hosts = dict(self.hosts)
+        return {host: limiter.status() for host, limiter in hosts.items()}
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Share of max_bytes a full cache is evicted down to, so that it is not
+# rescanned again on the very next write
+EVICT_TO = 0.9
+
+
+class ResponseCache:
+    """On-disk HTTP response cache for listing pages, keyed by URL.
+
+    Each entry keeps the page's validators (ETag / Last-Modified), a hash of the
+    body and the items parsed from it, so an unchanged page can be answered with
+    a 304 or a matching body hash without being parsed again. Entries expire
+    after ttl seconds and the least recently used ones are evicted once the
+    cache grows past max_bytes, down to EVICT_TO of it. The cache size is
+    tracked as entries are written, so the directory is only scanned when
+    that estimate crosses max_bytes (and once on the first write).
+    """
+
+    def __init__(self, cache_dir='cache', ttl=24 * 3600, max_bytes=50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Size of every entry file by path, None until the first scan
+        self._sizes = None
+        self._total = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def get(self, url):
+        """Return the cached entry for url, or None if missing or expired"""
+        path = self._path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if time.time() - entry.get('stored_at', 0) > self.ttl:
+            self._remove(path)
+            with self._lock:
+                self._forget(path)
+            return None
+
+        # Touch the file so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Build If-None-Match / If-Modified-Since headers for a cached entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url, response_headers, body_hash, items):
+        """Store validators, body hash and parsed items for url"""
+        entry = {
+            'url': url,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'body_hash': body_hash,
+            'stored_at': time.time(),
+            'items': items
+        }
+        body = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        path = self._path(url)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._sizes is not None:
+                self._total += len(body) - self._sizes.get(path, 0)
+                self._sizes[path] = len(body)
+            scan = self._sizes is None or self._total > self.max_bytes
+        if scan:
+            self.evict()
+
+    def _forget(self, path):
+        """Drop a removed entry from the size estimate; called with the lock held"""
+        if self._sizes is not None:
+            self._total -= self._sizes.pop(path, 0)
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes.
+
+        Scans the cache directory and resets the size estimate from it.
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            total = 0
+            for filename in os.listdir(self.cache_dir):
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(self.cache_dir, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                # mtime is refreshed on every hit, so an entry whose mtime is older
+                # than the TTL cannot have been stored within it either
+                if now - stat.st_mtime > self.ttl:
+                    self._remove(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            entries.sort()
+            sizes = {path: size for _, size, path in entries}
+            limit = self.max_bytes if total <= self.max_bytes else self.max_bytes * EVICT_TO
+            for _, size, path in entries:
+                if total <= limit:
+                    break
+                self._remove(path)
+                del sizes[path]
+                total -= size
+            self._sizes = sizes
+            self._total = total
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
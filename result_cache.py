@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+from result_index import ResultIndex
+
+try:
+    import brotli
+except ImportError:  # optional, only needed to serve br responses
+    brotli = None
+
+# Content codings the cache can precompress, in order of preference
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+class ResultCache:
+    """In-process cache of parsed results/<name>.json files for the read routes.
+
+    Result files are only ever replaced by an atomic rename, so each version
+    is a new inode. Each entry remembers the inode, mtime and size of the
+    version it parsed (taken from the open file, so they always describe the
+    bytes read); a lookup only stats the path and reparses when any changed.
+    The scraper also calls invalidate() right after writing a result. Entries keep the
+    compact JSON bytes next to the parsed data so API routes can return them
+    without serializing again, along with a strong ETag (SHA-256 of those
+    bytes) and gzip/brotli variants compressed once per file version.
+    """
+
+    def __init__(self, results_dir='results'):
+        self.results_dir = results_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(stat):
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _stat(self, filename):
+        try:
+            return self._signature(os.stat(os.path.join(self.results_dir, filename)))
+        except FileNotFoundError:
+            return None
+
+    def entry(self, filename):
+        """Cached entry (data, body, etag) of a result file, refreshed if the file changed"""
+        signature = self._stat(filename)
+        if signature is None:
+            self.invalidate(filename)
+            return None
+
+        entry = self._entries.get(filename)
+        if entry is not None and entry['signature'] == signature:
+            return entry
+
+        try:
+            with open(os.path.join(self.results_dir, filename), 'r', encoding='utf-8') as f:
+                signature = self._signature(os.fstat(f.fileno()))
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        entry = {
+            'signature': signature,
+            'data': data,
+            'body': body,
+            'etag': hashlib.sha256(body).hexdigest(),
+            'encoded': {},
+            'index': None
+        }
+        with self._lock:
+            self._entries[filename] = entry
+        return entry
+
+    def get(self, filename):
+        """Parsed content of a result file (None if missing); treat as read-only"""
+        entry = self.entry(filename)
+        return entry['data'] if entry else None
+
+    @staticmethod
+    def encoded(entry, encoding):
+        """Entry body compressed with 'gzip' or 'br', built once per file version"""
+        encoded = entry['encoded'].get(encoding)
+        if encoded is None:
+            if encoding == 'gzip':
+                encoded = gzip.compress(entry['body'], compresslevel=9, mtime=0)
+            elif encoding == 'br' and brotli is not None:
+                encoded = brotli.compress(entry['body'])
+            else:
+                raise ValueError(f'Unsupported encoding: {encoding}')
+            entry['encoded'][encoding] = encoded
+        return encoded
+
+    @staticmethod
+    def index(entry):
+        """Query index over the entry's items, built once per file version"""
+        if entry['index'] is None:
+            entry['index'] = ResultIndex(entry['data'].get('data', []))
+        return entry['index']
+
+    def invalidate(self, filename=None):
+        """Forget one cached file, or all of them"""
+        with self._lock:
+            if filename is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(filename, None)
@@ -0,0 +1,98 @@
+from bisect import bisect_left
+
+# Item fields that get an exact-match index, and how to split their values
+FILTER_FIELDS = {
+    'day': lambda value: [value],
+    'genre': lambda value: value.split(','),
+    'source_page': lambda value: [value],
+}
+
+
+def _key(value):
+    return str(value).strip().lower()
+
+
+def _grams(text, n=3):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _intersect(lists):
+    """Intersect sorted position lists, smallest first"""
+    lists = sorted(lists, key=len)
+    result = lists[0]
+    for other in lists[1:]:
+        members = set(other)
+        result = [position for position in result if position in members]
+    return result
+
+
+class ResultIndex:
+    """Query indexes over the items of one result document.
+
+    Built once per version of a results/ file: exact-match posting lists for
+    day, genre and source_page, and a trigram index over lowercased titles for
+    substring search. Posting lists hold item positions in document order, so
+    filters intersect them and pagination slices the result without scanning
+    the catalog.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.postings = {field: {} for field in FILTER_FIELDS}
+        self.titles = []
+        self.title_grams = {}
+
+        for position, anime in enumerate(items):
+            for field, split in FILTER_FIELDS.items():
+                value = anime.get(field)
+                if value in (None, 'N/A'):
+                    continue
+                for token in {_key(part) for part in split(str(value))}:
+                    if token:
+                        self.postings[field].setdefault(token, []).append(position)
+
+            title = _key(anime.get('title', ''))
+            self.titles.append(title)
+            for gram in _grams(title):
+                positions = self.title_grams.setdefault(gram, [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+    def _title_positions(self, query):
+        query = _key(query)
+        grams = _grams(query)
+        if grams:
+            candidates = _intersect([self.title_grams.get(gram, []) for gram in grams])
+        else:
+            # Queries shorter than a trigram fall back to checking every title
+            candidates = range(len(self.titles))
+        return [position for position in candidates if query in self.titles[position]]
+
+    def search(self, filters=None, title=None):
+        """Positions of the items matching every filter and the title substring"""
+        lists = []
+        for field, value in (filters or {}).items():
+            lists.append(self.postings[field].get(_key(value), []))
+        if title:
+            lists.append(self._title_positions(title))
+        if not lists:
+            return list(range(len(self.items)))
+        return _intersect(lists)
+
+    def page(self, positions, limit, offset=0, cursor=None):
+        """Slice matching positions by offset or by cursor (first position to return).
+
+        Returns (items, next_cursor); next_cursor is None on the last page.
+        """
+        start = bisect_left(positions, cursor) if cursor is not None else offset
+        window = positions[start:start + limit]
+        has_more = start + limit < len(positions)
+        next_cursor = window[-1] + 1 if window and has_more else None
+        return [self.items[position] for position in window], next_cursor
+
+    @staticmethod
+    def project(items, fields):
+        """Keep only the requested fields of each item"""
+        if not fields:
+            return items
+        return [{field: anime[field] for field in fields if field in anime} for anime in items]
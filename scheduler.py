@@ -0,0 +1,146 @@
+import random
+import threading
+import time
+from datetime import datetime
+
+# OtakuDesu's `day` values, indexed by datetime.weekday()
+WEEKDAYS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+
+class ScrapeScheduler:
+    """Re-scrapes every registered site on its own adaptive interval.
+
+    Each site starts from base_interval, scaled by how often its listing
+    changed across the last history_window history snapshots. After every
+    scheduled run the interval halves if the newest snapshot differs from the
+    previous one and grows by backoff otherwise, clamped to
+    [min_interval, max_interval]. Sites whose items carry a `day` field are
+    polled faster on days with many releases. Every delay gets +/- jitter so
+    sites do not fall into lockstep. Runs are incremental crawls submitted
+    through the job queue, so they coalesce with identical manual scrapes.
+    """
+
+    def __init__(self, scraper, jobs, pages=2, base_interval=3600, min_interval=900,
+                 max_interval=6 * 3600, backoff=1.5, jitter=0.1, history_window=10):
+        self.scraper = scraper
+        self.jobs = jobs
+        self.pages = pages
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.history_window = history_window
+        self.sites = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _clamp(self, interval):
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def change_rate(self, site_name):
+        """Share of consecutive recent snapshots whose item lists differ (None without history)"""
+        manifests = [m for m in self.scraper.history.recent_manifests(site_name, self.history_window) if m]
+        if len(manifests) < 2:
+            return None
+        changes = sum(newer != older for newer, older in zip(manifests, manifests[1:]))
+        return changes / (len(manifests) - 1)
+
+    def release_factor(self, site_name, now=None):
+        """Speed-up for today's releases: 1 + 7 x share of items airing today"""
+        result = self.scraper.results.get(f'{site_name}.json')
+        items = result.get('data', []) if result else []
+        days = [anime['day'] for anime in items if anime.get('day') not in (None, 'N/A')]
+        if not days:
+            return 1.0
+        today = WEEKDAYS[(now or datetime.now()).weekday()]
+        return 1 + 7 * days.count(today) / len(days)
+
+    def _initial_interval(self, site_name):
+        rate = self.change_rate(site_name)
+        if rate is None:
+            return self.base_interval
+        # Always-changing listings start at base / 2, never-changing ones at base * backoff^2
+        return self._clamp(self.base_interval * (self.backoff ** 2 if rate == 0 else 0.5 / rate))
+
+    def _delay(self, site_name):
+        state = self.sites[site_name]
+        delay = self._clamp(state['interval'] / self.release_factor(site_name))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def start(self):
+        """Start the scheduler thread (no-op if already running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            now = time.time()
+            for site_name in self.scraper.sites:
+                interval = self._initial_interval(site_name)
+                self.sites[site_name] = {'interval': interval, 'next_run': None,
+                                         'last_run': None, 'last_changed': None}
+                self.sites[site_name]['next_run'] = now + self._delay(site_name)
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._loop, name='scrape-scheduler', daemon=True)
+            self._thread.start()
+        print(f"[Scheduler] Aktif untuk {len(self.sites)} situs.")
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            with self._lock:
+                now = time.time()
+                due = [name for name, state in self.sites.items()
+                       if state['next_run'] is not None and state['next_run'] <= now]
+                for site_name in due:
+                    # Not rescheduled until the run finishes
+                    self.sites[site_name]['next_run'] = None
+                upcoming = [state['next_run'] for state in self.sites.values() if state['next_run']]
+
+            for site_name in due:
+                _, created = self.jobs.submit(('site', site_name, self.pages, None, True, False, False),
+                                              f'Scrape terjadwal {site_name} ({self.pages} hal)',
+                                              self._run_site, site_name)
+                if not created:
+                    # A matching manual scrape is already running; just try again later
+                    with self._lock:
+                        self.sites[site_name]['next_run'] = time.time() + self._delay(site_name)
+
+            self._wakeup.wait(max(min(upcoming) - time.time(), 1) if upcoming else 60)
+            self._wakeup.clear()
+
+    def _run_site(self, site_name):
+        try:
+            # Short refreshes must not touch the checkpoint of a failed long crawl
+            result = self.scraper.scrape_site(site_name, max_pages=self.pages, incremental=True,
+                                              checkpoint=False)
+            self.scraper.merge_incremental([result])
+            return result
+        finally:
+            self._reschedule(site_name)
+
+    def _reschedule(self, site_name):
+        manifests = self.scraper.history.recent_manifests(site_name, 2)
+        changed = len(manifests) < 2 or manifests[0] != manifests[1]
+        with self._lock:
+            state = self.sites[site_name]
+            factor = 0.5 if changed else self.backoff
+            state['interval'] = self._clamp(state['interval'] * factor)
+            state['last_run'] = time.time()
+            state['last_changed'] = changed
+            state['next_run'] = state['last_run'] + self._delay(site_name)
+            print(f"[Scheduler] {site_name} {'berubah' if changed else 'tidak berubah'}, "
+                  f"scrape berikutnya dalam {state['next_run'] - state['last_run']:.0f}s")
+        self._wakeup.set()
+
+    def status(self):
+        """Per-site interval, last run and next run (epoch seconds)"""
+        with self._lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'sites': {name: dict(state) for name, state in self.sites.items()}
+            }
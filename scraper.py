@@ -1,109 +1,587 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import time
 from datetime import datetime
 import os
 import hashlib
+import threading
+import random
+import asyncio
+from urllib.parse import urlparse
+from response_cache import ResponseCache
+from sites import SITES, PLACEHOLDER_IMAGE
+from history_store import HistoryStore
+from result_cache import ResultCache
+from progress import ProgressBroker
+from frontier import Frontier
+from checkpoint import CrawlCheckpoint
+from thumbnails import ThumbnailCache
+from metrics import Metrics
+from ndjson_writer import NDJSONWriter
+from atomic_files import write_atomic
+from rate_limiter import RateLimiter, retry_after_seconds
+from title_matcher import TitleMatcher, IncrementalMatcher
+
+try:
+    import aiohttp
+except ImportError:  # optional, only needed by scrape_async
+    aiohttp = None
+
+# HTTP statuses worth retrying; anything else is treated as a permanent failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def _html_root(content):
+    if not content or not content.strip():
+        return None
+    return lxml_html.fromstring(content)
 
 class AnimeScraper:
-    def __init__(self):
+    def __init__(self, page_workers=1, per_host_limit=2, request_delay=0.5,
+                 max_per_host=8, max_rate=None, pool_connections=10, pool_maxsize=10, max_retries=3,
+                 backoff_factor=0.5, timeout=10, use_cache=True, cache_dir='cache',
+                 cache_ttl=24 * 3600, cache_max_bytes=50 * 1024 * 1024,
+                 parser='lxml', extractor='soup', match_threshold=85):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        # One keep-alive session shared by every thread; the adapter keeps a
+        # connection pool per host so pages reuse TCP/TLS connections.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
         self.results_dir = 'results'
         self.history_dir = 'history'
+        self.checkpoint_dir = 'checkpoints'
+        # Checkpointed pages older than this are fetched again on resume
+        self.checkpoint_max_age = cache_ttl
+        # Page-level concurrency: number of pages of one site fetched at once,
+        # capped per host so parallel page fetching stays polite.
+        self.page_workers = page_workers
+        self.per_host_limit = per_host_limit
+        self.max_per_host = max(max_per_host, per_host_limit)
+        self.request_delay = request_delay
+        # Per-host token bucket + adaptive concurrency shared by every fetch path.
+        # Starts at per_host_limit requests in flight and 1/request_delay req/s
+        # (no rate cap with request_delay=0), then adapts to how the host copes;
+        # max_rate optionally caps the req/s a host can ever get, the start rate included.
+        start_rate = 1 / request_delay if request_delay > 0 else None
+        if max_rate is not None:
+            start_rate = min(start_rate, max_rate) if start_rate is not None else max_rate
+        self.rate_limiter = RateLimiter(rate=start_rate, concurrency=per_host_limit,
+                                        max_concurrency=self.max_per_host, max_rate=max_rate)
+        # HTML parsing: BeautifulSoup backend ('lxml' or 'html.parser') for the
+        # 'soup' extractor, or 'xpath' for precompiled lxml XPath extraction
+        self.parser = parser
+        self.extractor = extractor
+        # Fuzzy title matcher used by merge_anime_data (scores 0-100)
+        self.matcher = TitleMatcher(threshold=match_threshold)
+        # In-memory match state for merge_incremental
+        self._merge_state = IncrementalMatcher(self.matcher)
+        # Result file version each side was last loaded from (None: fed a fresh result)
+        self._merge_sources = {}
+        self._merge_lock = threading.Lock()
+        self._merged_signature = None
+        self._merged_last = None
+        # Registered site adapters (see sites.py), keyed by site name
+        self.sites = SITES
+        # Conditional-GET cache for listing pages (None disables it)
+        self.cache = ResponseCache(cache_dir, cache_ttl, cache_max_bytes) if use_cache else None
         os.makedirs(self.results_dir, exist_ok=True)
         os.makedirs(self.history_dir, exist_ok=True)
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        # Per-site, per-phase timings and counters (exposed on /metrics)
+        self.metrics = Metrics()
+        self._site_hosts = {}
+        # Structured progress events (page/site started, finished, failed)
+        self.progress = ProgressBroker()
+        # Parsed results/ files shared with the Flask read routes
+        self.results = ResultCache(self.results_dir)
+        # One writer at a time per results/ file (readers never lock)
+        self._result_locks = {}
+        self._result_locks_lock = threading.Lock()
+        # Local poster copies served by the Flask /thumb route
+        self.thumbnails = ThumbnailCache('thumbnails')
+        # Indexed history store; legacy per-run JSON files are imported once
+        self.history = HistoryStore(os.path.join(self.history_dir, 'history.db'))
+        self.history.import_json_files(self.history_dir)
+
+    def _site_of(self, url):
+        """Metrics label for a URL: the adapter name of its host, else the host"""
+        host = urlparse(url).netloc
+        site = self._site_hosts.get(host)
+        if site is None:
+            site = next((name for name, adapter in self.sites.items()
+                         if urlparse(adapter.base_url).netloc == host), host)
+            self._site_hosts[host] = site
+        return site
+
+    def _record_response(self, site, status, started, headers_at, body):
+        """Record time to response headers (DNS, connect, server) and body download"""
+        self.metrics.observe('response', headers_at - started, site)
+        self.metrics.observe('download', time.perf_counter() - headers_at, site)
+        self.metrics.inc('scraper_requests_total', site=site, status=status)
+        self.metrics.inc('scraper_bytes_fetched_total', len(body or b''), site=site)
+
+    def fetch_page(self, url, headers=None):
+        """Fetch a page through the pooled session while holding a rate limiter slot.
+
+        The host's limiter learns from every response (see rate_limiter.py).
+        Connection errors, timeouts and RETRY_STATUSES responses are retried up to
+        max_retries times with jittered exponential backoff.
+        """
+        site = self._site_of(url)
+        for attempt in range(self.max_retries + 1):
+            try:
+                waited = time.perf_counter()
+                with self.rate_limiter.slot(url) as feedback:
+                    started = time.perf_counter()
+                    self.metrics.observe('delay', started - waited, site)
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                    # elapsed covers sending the request up to parsed response headers
+                    headers_at = min(started + response.elapsed.total_seconds(), time.perf_counter())
+                    feedback.update(status=response.status_code, latency=headers_at - started,
+                                    retry_after=retry_after_seconds(response.headers.get('Retry-After')))
+                    self._record_response(site, response.status_code, started, headers_at, response.content)
+                response.raise_for_status()
+                return response
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status = e.response.status_code if e.response is not None else None
+                if attempt >= self.max_retries or (status is not None and status not in RETRY_STATUSES):
+                    raise
+                delay = random.uniform(0, self.backoff_factor * (2 ** attempt))
+                print(f"Retry {attempt + 1}/{self.max_retries} untuk {url} dalam {delay:.2f}s: {e}")
+                self.metrics.inc('scraper_retries_total', site=site)
+                with self.metrics.timer('backoff', site):
+                    time.sleep(delay)
+
+    def _cached_entry(self, url):
+        """Return (cache entry, conditional request headers) for url"""
+        if self.cache is None:
+            return None, {}
+        entry = self.cache.get(url)
+        return entry, ResponseCache.conditional_headers(entry)
+
+    def _page_items(self, adapter, url, page, entry, status, response_headers, body):
+        """Turn a listing response into items, reusing cached items when unchanged.
+
+        A 304 or a body whose hash matches the cached one skips parsing entirely.
+        Either way the entry is stored again, so its TTL counts from this
+        revalidation rather than from the last full download.
+        """
+        if status == 304 and entry is not None:
+            print(f"[{adapter.label}] Halaman {page} tidak berubah (304), memakai cache.")
+            if self.cache is not None:
+                # A 304 may send new validators; otherwise keep the cached ones
+                validators = {'ETag': response_headers.get('ETag') or entry.get('etag'),
+                              'Last-Modified': response_headers.get('Last-Modified') or entry.get('last_modified')}
+                self.cache.put(url, validators, entry.get('body_hash'), entry['items'])
+            return entry['items']
         
-    def save_to_history(self, site_name, result):
-        """Save scraping result to history with timestamp"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'{self.history_dir}/{site_name}_{timestamp}.json'
+        body_hash = hashlib.sha256(body).hexdigest()
+        if entry is not None and entry.get('body_hash') == body_hash:
+            print(f"[{adapter.label}] Halaman {page} tidak berubah (hash sama), memakai cache.")
+            items = entry['items']
+        else:
+            items = self._parse_page(adapter, body, page)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        if self.cache is not None:
+            self.cache.put(url, response_headers, body_hash, items)
+        return items
+
+    def _page_event(self, adapter, page, started, items=None, error=None):
+        """Publish the outcome of one listing page; a 404 ends pagination, not an error"""
+        not_found = getattr(getattr(error, 'response', None), 'status_code', None) == 404
+        if error is not None and not not_found:
+            self.progress.publish('page_failed', site=adapter.name, label=adapter.label, page=page,
+                                  latency=time.time() - started, error=str(error))
+        else:
+            self.progress.publish('page_finished', site=adapter.name, label=adapter.label, page=page,
+                                  latency=time.time() - started, count=len(items or []),
+                                  data=items or [])
+
+    def _site_event(self, adapter, result):
+        self.progress.publish('site_finished', site=adapter.name, label=adapter.label,
+                              success=result['success'], count=result['count'],
+                              pages_scraped=result['pages_scraped'],
+                              failed_pages=len(result['failed_pages']),
+                              execution_time=result['execution_time'], error=result.get('error'))
+
+    def _run_page(self, scrape_page, page):
+        """Run scrape_page for one page and return (items, error).
+
+        A 404 counts as an empty page (end of pagination); other request errors are
+        returned instead of raised so one bad page does not abort the crawl.
+        """
+        try:
+            return scrape_page(page), None
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return [], None
+            return None, e
+        except requests.RequestException as e:
+            return None, e
+
+    def _collect_pages(self, label, outcomes, all_items, failed_pages, stop=None, stream=None,
+                       unique=False):
+        """Collect (page, items, error) outcomes in page order.
+
+        Stops at the first empty page, or after a page for which stop(items) is
+        true. Items are appended to all_items so partial data survives errors
+        (all_items None keeps nothing), and written to stream (an NDJSONWriter)
+        as each page is collected. Pages that still fail after retries are
+        recorded in failed_pages and skipped; the crawl only fails when no page
+        succeeded. With unique=True an item whose link was already collected
+        is skipped: a resumed crawl mixes checkpointed and fresh pages, and
+        items that moved down the listing in between appear on both.
+        Returns the number of pages scraped.
+        """
+        pages_scraped = 0
+        collected = 0
+        last_error = None
+        links = set()
+
+        for page, items, error in outcomes:
+            if error is not None:
+                print(f"[{label}] Halaman {page} gagal: {error}")
+                failed_pages.append({'page': page, 'error': str(error)})
+                last_error = error
+                continue
+            if not items:
+                print(f"[{label}] Halaman {page} kosong. Berhenti.")
+                break
+            page_items = items
+            if unique:
+                page_items = [anime for anime in items
+                              if anime.get('link') in (None, 'N/A') or anime.get('link') not in links]
+                links.update(anime.get('link') for anime in page_items)
+            collected += len(page_items)
+            if all_items is not None:
+                all_items.extend(page_items)
+            if stream is not None:
+                stream.write(page_items)
+            pages_scraped = page
+            if stop is not None and stop(items):
+                print(f"[{label}] Halaman {page} hanya berisi item lama. Berhenti.")
+                break
+
+        if last_error is not None and not collected:
+            raise last_error
+        return pages_scraped
+
+    def _crawl_pages(self, label, scrape_page, max_pages, page_workers, all_items, failed_pages,
+                     stop=None, stream=None, unique=False):
+        """Run scrape_page(page) for pages 1..max_pages and collect items in page order.
+
+        With page_workers > 1 pages are fetched through a bounded pool; pages after
+        the first empty one are cancelled or discarded. See _collect_pages.
+        """
+        if page_workers <= 1:
+            outcomes = ((page, *self._run_page(scrape_page, page))
+                        for page in range(1, max_pages + 1))
+            return self._collect_pages(label, outcomes, all_items, failed_pages, stop, stream,
+                                       unique)
+
+        with ThreadPoolExecutor(max_workers=page_workers) as executor:
+            futures = [executor.submit(self._run_page, scrape_page, page)
+                       for page in range(1, max_pages + 1)]
+            try:
+                outcomes = ((page, *future.result())
+                            for page, future in enumerate(futures, start=1))
+                return self._collect_pages(label, outcomes, all_items, failed_pages, stop, stream,
+                                           unique)
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _known_items(self, adapter):
+        """Previous successful result of a site and the set of its item keys (None, None if absent)"""
+        previous = self.load_json(f'{adapter.name}.json')
+        if not previous or not previous.get('success'):
+            return None, None
+        return previous, {adapter.item_key(anime) for anime in previous.get('data', [])}
+
+    @staticmethod
+    def _only_known(adapter, known):
+        """Stop predicate for incremental crawls: a page with nothing new"""
+        return lambda items: all(adapter.item_key(anime) in known for anime in items)
+
+    def _merge_known(self, adapter, items, previous, known, pages_scraped, failed_pages=()):
+        """Fresh items first, then the previous items listed below the crawled part.
+
+        Items are matched by link, so a fresh item (e.g. with a new episode)
+        replaces its old entry. The carried-over tail starts after the last
+        previous item seen again unchanged: unchanged items keep their relative
+        order, so previous items above that point that were not seen again
+        have left the listing. Without any unchanged item, only previous items
+        from pages past the crawled ones are carried over. That only holds when
+        every crawled page succeeded: with failed pages every previous item not
+        crawled again is kept (with its previous source_page, so retry_page of
+        the failed page replaces them).
+        """
+        crawled = {adapter.item_key(anime) for anime in items}
+        links = {anime.get('link') for anime in items}
+        old = previous.get('data', [])
+        unchanged_at = [i for i, anime in enumerate(old) if adapter.item_key(anime) in crawled]
+        if failed_pages:
+            tail = old
+        elif unchanged_at:
+            tail = old[unchanged_at[-1] + 1:]
+        else:
+            tail = [anime for anime in old if anime.get('source_page', 0) > pages_scraped]
+        merged = items + [anime for anime in tail if anime.get('link') not in links]
+        print(f"[{adapter.label}] Incremental: {len(crawled - known)} item baru, {len(merged)} item total.")
+        return merged
+
+    def _site_result(self, site, url, start_time, all_anime, failed_pages, pages_scraped, error=None):
+        """Build the result document written to results/<site>.json"""
+        result = {
+            'success': error is None,
+            'site': site,
+            'url': url,
+            'pages_scraped': pages_scraped,
+            'timestamp': datetime.now().isoformat(),
+            'execution_time': time.time() - start_time,
+            'failed_pages': failed_pages,
+            'data': all_anime,
+            'count': len(all_anime)
+        }
+        if error is not None:
+            result['error'] = str(error)
+        return result
+
+    def _result_lock(self, filename):
+        """Re-entrant lock serializing writers of one results/ file"""
+        with self._result_locks_lock:
+            if filename not in self._result_locks:
+                self._result_locks[filename] = threading.RLock()
+            return self._result_locks[filename]
+
+    def _write_result(self, filename, data):
+        """Atomically replace a file in results/ and drop its cached copy"""
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with self._result_lock(filename):
+            write_atomic(os.path.join(self.results_dir, filename), body)
+            self.results.invalidate(filename)
+
+    def _item_stream(self, site_name):
+        """NDJSON writer for results/<site>.ndjson, filled while pages are parsed"""
+        return NDJSONWriter(os.path.join(self.results_dir, f'{site_name}.ndjson'))
+
+    def _write_items(self, site_name, items, stream=None):
+        """Complete results/<site>.ndjson with the items not streamed yet and swap it in.
+
+        Streamed items are always a prefix of the final list (incremental merges
+        append the previous items after the fresh ones). A stream that was
+        already committed or aborted is replaced by a fresh one.
+        """
+        if stream is None or stream.closed:
+            stream = self._item_stream(site_name)
+        try:
+            stream.write(items[stream.count:])
+            stream.commit()
+        except Exception:
+            stream.abort()
+            raise
+
+    def _save_site_result(self, site_name, result, metrics_before=None, stream=None):
+        """Write a site result to results/ (JSON and NDJSON) and history/.
+
+        With metrics_before (a site_summary() taken when the run started) the
+        run's phase timings and counters are stored in result['metrics'].
+        """
+        if metrics_before is not None:
+            result['metrics'] = self.metrics.diff(metrics_before, self.metrics.site_summary(site_name))
+        # Concurrent runs of one site swap in their NDJSON and JSON as a pair
+        with self.metrics.timer('save', site_name), self._result_lock(f'{site_name}.json'):
+            self._write_items(site_name, result['data'], stream)
+            self._write_result(f'{site_name}.json', result)
+            self.save_to_history(site_name, result)
+
+    def _save_stream_result(self, site_name, result, metrics_before, stream):
+        """Swap in results/<site>.ndjson of a stream_only run.
+
+        results/<site>.json, its cache and history are left as they were, so
+        the item list is never held or serialized as one document.
+        """
+        result['metrics'] = self.metrics.diff(metrics_before, self.metrics.site_summary(site_name))
+        with self.metrics.timer('save', site_name), self._result_lock(f'{site_name}.json'):
+            try:
+                stream.commit()
+            except Exception:
+                stream.abort()
+                raise
+
+    def retry_page(self, site_name, page):
+        """Re-scrape a single page and splice its items into results/<site>.json"""
+        adapter = self.sites[site_name]
+        if not os.path.exists(os.path.join(self.results_dir, f'{site_name}.json')):
+            return None
+        items = self._scrape_page(adapter, page)
         
-        return filename
+        # Read-modify-write under the file's lock so a concurrent scrape is not lost
+        with self._result_lock(f'{site_name}.json'):
+            return self._splice_page(site_name, page, items)
     
-    def get_history(self, site_name=None, limit=10):
-        """Get scraping history, optionally filtered by site"""
-        history_files = []
+    def _splice_page(self, site_name, page, items):
+        """Replace one page's items in the current results/<site>.json"""
+        result = self.load_json(f'{site_name}.json')
+        if result is None:
+            return None
         
-        for filename in os.listdir(self.history_dir):
-            if filename.endswith('.json'):
-                if site_name and not filename.startswith(site_name):
-                    continue
-                    
-                filepath = os.path.join(self.history_dir, filename)
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    history_files.append({
-                        'filename': filename,
-                        'filepath': filepath,
-                        'site': data.get('site', 'Unknown'),
-                        'timestamp': data.get('timestamp'),
-                        'count': data.get('count', 0),
-                        'success': data.get('success', False),
-                        'execution_time': data.get('execution_time', 0)
-                    })
+        data = [anime for anime in result.get('data', []) if anime.get('source_page') != page]
+        data.extend(items)
+        # Stable sort keeps the on-page order of each page's items
+        data.sort(key=lambda anime: anime.get('source_page', 0))
+        
+        result['data'] = data
+        result['count'] = len(data)
+        result['failed_pages'] = [f for f in result.get('failed_pages', []) if f['page'] != page]
+        result['pages_scraped'] = max(result.get('pages_scraped', 0), page if items else 0)
+        
+        self._write_items(site_name, data)
+        self._write_result(f'{site_name}.json', result)
         
-        # Sort by timestamp descending
-        history_files.sort(key=lambda x: x['timestamp'], reverse=True)
+        print(f"✓ {result.get('site', site_name)} halaman {page} di-scrape ulang: {len(items)} item")
+        return result
         
-        return history_files[:limit]
+    def save_to_history(self, site_name, result):
+        """Save scraping result to history with timestamp"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return self.history.add(site_name, f'{site_name}_{timestamp}.json', result)
+    
+    def get_history(self, site_name=None, limit=10, offset=0):
+        """Get scraping history (newest first), optionally filtered by site"""
+        return self.history.list(site_name, limit=limit, offset=offset)
+    
+    def count_history(self, site_name=None):
+        """Number of history snapshots, optionally for one site"""
+        return self.history.count(site_name)
+    
+    def get_history_snapshot(self, filename):
+        """Full result stored for one history snapshot (None if unknown)"""
+        return self.history.get(filename)
+    
+    def delete_history(self, filename):
+        """Delete one history snapshot, including a legacy JSON file; returns True if found"""
+        deleted = self.history.delete(filename)
+        legacy_path = os.path.join(self.history_dir, os.path.basename(filename))
+        if filename.endswith('.json') and os.path.exists(legacy_path):
+            os.remove(legacy_path)
+            deleted = True
+        return deleted
+    
+    def clear_history(self):
+        """Delete every history snapshot, including legacy JSON files"""
+        self.history.clear()
+        for filename in os.listdir(self.history_dir):
+            if filename.endswith('.json'):
+                os.remove(os.path.join(self.history_dir, filename))
     
     def merge_anime_data(self):
-        """Merge anime data from both sites and find matches"""
+        """Merge anime data from both sites and find fuzzy title matches"""
         otakudesu = self.load_json('otakudesu.json')
         kusonime = self.load_json('kusonime.json')
         
         if not otakudesu or not kusonime:
             return None
         
-        merged_data = {
-            'timestamp': datetime.now().isoformat(),
-            'total_otakudesu': otakudesu.get('count', 0),
-            'total_kusonime': kusonime.get('count', 0),
-            'matches': [],
-            'otakudesu_only': [],
-            'kusonime_only': []
-        }
-        
-        # Normalize titles for comparison
-        def normalize_title(title):
-            return title.lower().replace(' ', '').replace('-', '')
-        
-        # Create dictionaries for quick lookup
-        otaku_dict = {normalize_title(anime['title']): anime 
-                      for anime in otakudesu.get('data', [])}
-        kuso_dict = {normalize_title(anime['title']): anime 
-                     for anime in kusonime.get('data', [])}
-        
-        # Find matches
-        for norm_title, otaku_anime in otaku_dict.items():
-            if norm_title in kuso_dict:
-                merged_data['matches'].append({
-                    'title': otaku_anime['title'],
-                    'otakudesu': otaku_anime,
-                    'kusonime': kuso_dict[norm_title],
-                    'match_score': 100
-                })
-            else:
-                merged_data['otakudesu_only'].append(otaku_anime)
-        
-        # Find Kusonime-only entries
-        for norm_title, kuso_anime in kuso_dict.items():
-            if norm_title not in otaku_dict:
-                merged_data['kusonime_only'].append(kuso_anime)
+        with self.metrics.timer('merge', 'merged'):
+            matches, otakudesu_only, kusonime_only = self.matcher.match(
+                otakudesu.get('data', []), kusonime.get('data', []))
+        merged_data = self._merged_document(otakudesu.get('count', 0), kusonime.get('count', 0),
+                                            matches, otakudesu_only, kusonime_only)
         
         # Save merged data
-        with open(f'{self.results_dir}/merged.json', 'w', encoding='utf-8') as f:
-            json.dump(merged_data, f, indent=2, ensure_ascii=False)
+        self._write_merged(merged_data)
         
         return merged_data
     
+    def _merged_document(self, total_otakudesu, total_kusonime, matches, otakudesu_only, kusonime_only):
+        """Build the merged.json document from matcher output"""
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'total_otakudesu': total_otakudesu,
+            'total_kusonime': total_kusonime,
+            'matches': [{
+                'title': otaku_anime['title'],
+                'otakudesu': otaku_anime,
+                'kusonime': kuso_anime,
+                'match_score': round(score, 1)
+            } for otaku_anime, kuso_anime, score in matches],
+            'otakudesu_only': otakudesu_only,
+            'kusonime_only': kusonime_only
+        }
+    
+    @staticmethod
+    def _merged_signature_of(merged_data):
+        """Hash of a merged document ignoring its timestamp"""
+        content = {k: v for k, v in merged_data.items() if k != 'timestamp'}
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def _write_merged(self, merged_data):
+        self._write_result('merged.json', merged_data)
+        self._merged_signature = self._merged_signature_of(merged_data)
+    
+    def merge_incremental(self, results=None):
+        """Update merged.json from the latest site results without a full re-merge.
+
+        Only items added or removed since the previous merge are indexed and scored;
+        a side missing from results is (re)loaded from results/<site>.json
+        whenever that file changed since it was last merged, e.g. after a
+        single-site scrape or retry_page.
+        merged.json is rewritten only when the merged output actually changed.
+        Returns the merged document, or None if a site has no data yet.
+        """
+        fresh = {result.get('site'): result for result in results or [] if result.get('success')}
+        
+        with self._merge_lock, self.metrics.timer('merge', 'merged'):
+            state = self._merge_state
+            changed = False
+            counts = {}
+            for side, site_name in (('left', 'otakudesu'), ('right', 'kusonime')):
+                result = fresh.get(self.sites[site_name].site)
+                if result is not None:
+                    changed = state.update(side, result.get('data', [])) or changed
+                    # The file version is unknown, so the next merge without it re-reads the file
+                    self._merge_sources[side] = None
+                else:
+                    entry = self.results.entry(f'{site_name}.json')
+                    if entry is None:
+                        if side not in self._merge_sources:
+                            return None
+                    elif entry['signature'] != self._merge_sources.get(side):
+                        changed = state.update(side, entry['data'].get('data', [])) or changed
+                        self._merge_sources[side] = entry['signature']
+                counts[site_name] = len(state.order[side])
+            
+            if not changed and self._merged_last is not None:
+                print("✓ Merged data tidak berubah, merged.json tidak ditulis ulang.")
+                return self._merged_last
+            
+            matches, otakudesu_only, kusonime_only = state.result()
+            merged_data = self._merged_document(counts['otakudesu'], counts['kusonime'],
+                                                matches, otakudesu_only, kusonime_only)
+            
+            if self._merged_signature is None:
+                existing = self.load_json('merged.json')
+                if existing:
+                    self._merged_signature = self._merged_signature_of(existing)
+            if self._merged_signature_of(merged_data) != self._merged_signature:
+                self._write_merged(merged_data)
+            else:
+                print("✓ Merged data tidak berubah, merged.json tidak ditulis ulang.")
+            self._merged_last = merged_data
+            return merged_data
+    
     def load_json(self, filename):
         """Load JSON file"""
         try:
@@ -113,250 +591,295 @@ class AnimeScraper:
         except FileNotFoundError:
             return None
         
-    def scrape_otakudesu(self, max_pages=4):
-        """Scrape anime list from OtakuDesu with pagination."""
+    def _parse_page(self, adapter, content, page):
+        """Parse the items of a listing page with the configured parser/extractor"""
+        with self.metrics.timer('parse', adapter.name):
+            if self.extractor == 'xpath':
+                root = _html_root(content)
+                if root is None:
+                    return []
+                items = adapter.find_items_xpath(root)
+                extract = adapter.extract_xpath
+            else:
+                soup = BeautifulSoup(content, self.parser, parse_only=adapter.strainer)
+                items = adapter.find_items(soup, page)
+                extract = adapter.extract
+        
+        page_anime = []
+        with self.metrics.timer('extract', adapter.name):
+            for item in items:
+                try:
+                    anime = extract(item)
+                    anime['source_page'] = page
+                    page_anime.append(anime)
+                except Exception as e:
+                    print(f"Error parsing {adapter.site} item: {e}")
+                    self.metrics.inc('scraper_parse_errors_total', site=adapter.name)
+                    continue
+        
+        self.metrics.inc('scraper_items_parsed_total', len(page_anime), site=adapter.name)
+        return page_anime
+    
+    def _scrape_page(self, adapter, page):
+        """Fetch and parse one listing page of a site"""
+        url = adapter.page_url(page)
+        print(f"[{adapter.label}] Scraping halaman {page}: {url}")
+        started = time.time()
+        self.progress.publish('page_started', site=adapter.name, label=adapter.label, page=page, url=url)
+        entry, headers = self._cached_entry(url)
+        try:
+            response = self.fetch_page(url, headers=headers)
+        except requests.RequestException as e:
+            self._page_event(adapter, page, started, error=e)
+            raise
+        page_anime = self._page_items(adapter, url, page, entry, response.status_code,
+                                      response.headers, response.content)
+        self._page_event(adapter, page, started, items=page_anime)
+        if page_anime:
+            print(f"[{adapter.label}] Selesai halaman {page}, {len(page_anime)} item ditemukan.")
+        return page_anime
+    
+    def _checkpoint(self, adapter, max_pages, resume):
+        """Return (checkpoint, pages already done) for a crawl of max_pages pages of a site.
+
+        Checkpoints are kept per site and max_pages, so crawls of different
+        lengths never share one. Without resume nothing is reused, but an
+        existing checkpoint is only replaced once this run completes. Pages
+        checkpointed more than checkpoint_max_age seconds ago are not reused.
+        """
+        checkpoint = CrawlCheckpoint(os.path.join(self.checkpoint_dir,
+                                                  f'{adapter.name}_{max_pages}.ndjson'))
+        if not resume:
+            return checkpoint, {}
+        done = checkpoint.load(self.checkpoint_max_age)
+        if done:
+            print(f"[{adapter.label}] Melanjutkan dari checkpoint: {len(done)} halaman sudah selesai.")
+        return checkpoint, done
+
+    def _reuse_page(self, adapter, page, items):
+        """Report a page taken from the checkpoint as finished"""
+        print(f"[{adapter.label}] Halaman {page} dari checkpoint, {len(items)} item.")
+        self._page_event(adapter, page, time.time(), items=items)
+        return items
+
+    def _checkpointed_page(self, adapter, page, checkpoint, done):
+        """_scrape_page that reuses checkpointed pages and records new ones"""
+        if page in done:
+            return self._reuse_page(adapter, page, done[page])
+        items = self._scrape_page(adapter, page)
+        if checkpoint is not None:
+            checkpoint.record(page, items)
+        return items
+
+    @staticmethod
+    def _finish_checkpoint(checkpoint, result):
+        """Drop the checkpoint after a run without failed pages; keep it for resume otherwise"""
+        if checkpoint is not None and result['success'] and not result['failed_pages']:
+            checkpoint.clear()
+
+    def scrape_site(self, site_name, max_pages=4, page_workers=None, incremental=False, resume=False,
+                    checkpoint=True, stream_only=False):
+        """Scrape the anime list of a registered site with pagination.
+
+        page_workers > 1 fetches pages concurrently (defaults to self.page_workers).
+        With incremental=True pagination stops at the first page holding only
+        items already in the previous result, and the fresh items are merged
+        into it. Every finished page is checkpointed (unless checkpoint=False,
+        which leaves existing checkpoints alone); resume=True reuses the pages
+        of an earlier run of the same length that failed or was interrupted
+        and only fetches the rest.
+
+        stream_only=True only writes results/<site>.ndjson: items are not kept
+        in memory after their page is streamed, and results/<site>.json and
+        history are not updated. The returned result has a count but no data.
+        """
+        if stream_only and incremental:
+            raise ValueError('stream_only tidak bisa dipakai bersama incremental')
+        adapter = self.sites[site_name]
         start_time = time.time()
-        base_url = 'https://otakudesu.best/ongoing-anime/'
-        all_anime = [] 
+        all_anime = None if stream_only else []
+        failed_pages = []
+        pages_scraped = 0
+        if page_workers is None:
+            page_workers = self.page_workers
+        previous, known = self._known_items(adapter) if incremental else (None, None)
+        stop = self._only_known(adapter, known) if known is not None else None
         
-        print(f"[Otakudesu] Mulai scraping. Target: {max_pages} halaman.")
+        print(f"[{adapter.label}] Mulai scraping. Target: {max_pages} halaman.")
+        metrics_before = self.metrics.site_summary(site_name)
+        stream = self._item_stream(site_name)
+        checkpoint, done = self._checkpoint(adapter, max_pages, resume) if checkpoint else (None, {})
+        self.progress.publish('site_started', site=adapter.name, label=adapter.label, max_pages=max_pages)
         
         try:
-            for page in range(1, max_pages + 1):
-                if page == 1:
-                    url = base_url
-                else:
-                    url = f'{base_url}page/{page}/'
-                
-                print(f"[Otakudesu] Scraping halaman {page}: {url}")
-                response = requests.get(url, headers=self.headers, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                anime_items = soup.find_all('div', class_='detpost')
-                
-                if not anime_items:
-                    print(f"[Otakudesu] Halaman {page} kosong. Berhenti.")
-                    break
-                
-                page_item_count = 0
-                for item in anime_items:
-                    try:
-                        title_elem = item.find('h2', class_='jdlflm')
-                        title = title_elem.text.strip() if title_elem else 'N/A'
-                        
-                        link_elem = item.find('a') 
-                        link = link_elem['href'] if link_elem and 'href' in link_elem.attrs else 'N/A'
-                        
-                        img_elem = item.find('img')
-                        image = img_elem['src'] if img_elem and 'src' in img_elem.attrs else 'https://via.placeholder.com/150'
-                        
-                        episode_elem = item.find('div', class_='epz')
-                        episode = episode_elem.text.strip() if episode_elem else 'N/A'
-                        
-                        day_elem = item.find('div', class_='epztipe')
-                        day = day_elem.text.strip() if day_elem else 'N/A'
-                        
-                        rating_elem = item.find('div', class_='bt')
-                        rating = rating_elem.text.strip() if rating_elem else 'N/A'
-                        
-                        all_anime.append({
-                            'title': title,
-                            'episode': episode,
-                            'day': day,
-                            'rating': rating,
-                            'image': image,
-                            'link': link,
-                            'source_page': page
-                        })
-                        page_item_count += 1
-                    except Exception as e:
-                        print(f"Error parsing OtakuDesu item: {e}")
-                        continue
-                
-                print(f"[Otakudesu] Selesai halaman {page}, {page_item_count} item ditemukan.")
-                time.sleep(0.5)
-            
-            end_time = time.time()
-            execution_time = end_time - start_time
-            
-            result = {
-                'success': True,
-                'site': 'OtakuDesu',
-                'url': base_url,
-                'pages_scraped': page if page > 1 else 1,
-                'timestamp': datetime.now().isoformat(),
-                'execution_time': execution_time,
-                'data': all_anime,
-                'count': len(all_anime)
-            }
-            
-            with open(f'{self.results_dir}/otakudesu.json', 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            # Save to history
-            self.save_to_history('otakudesu', result)
+            pages_scraped = self._crawl_pages(adapter.label,
+                                              lambda page: self._checkpointed_page(adapter, page,
+                                                                                   checkpoint, done),
+                                              max_pages, page_workers, all_anime, failed_pages,
+                                              stop, stream, unique=bool(done))
+            if known is not None:
+                all_anime = self._merge_known(adapter, all_anime, previous, known, pages_scraped,
+                                               failed_pages)
+            result = self._site_result(adapter.site, adapter.base_url, start_time,
+                                       all_anime or [], failed_pages, pages_scraped)
+            if stream_only:
+                del result['data']
+                result['count'] = stream.count
+                self._save_stream_result(site_name, result, metrics_before, stream)
+            else:
+                self._save_site_result(site_name, result, metrics_before, stream)
+            self._finish_checkpoint(checkpoint, result)
+            self._site_event(adapter, result)
             
-            print(f"✓ OtakuDesu scraped: {len(all_anime)} anime in {execution_time:.2f}s")
+            print(f"✓ {adapter.site} scraped: {result['count']} anime in {result['execution_time']:.2f}s")
             return result
             
         except Exception as e:
-            end_time = time.time()
-            execution_time = end_time - start_time
-            result = {
-                'success': False,
-                'site': 'OtakuDesu',
-                'timestamp': datetime.now().isoformat(),
-                'execution_time': execution_time,
-                'error': str(e),
-                'data': all_anime
-            }
-            with open(f'{self.results_dir}/otakudesu.json', 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            self.save_to_history('otakudesu', result)
+            if all_anime:
+                pages_scraped = all_anime[-1]['source_page']
+            result = self._site_result(adapter.site, adapter.base_url, start_time,
+                                       all_anime or [], failed_pages, pages_scraped, error=e)
+            if stream_only:
+                # Keep the previous NDJSON file rather than an empty one
+                stream.abort()
+                del result['data']
+            else:
+                self._save_site_result(site_name, result, metrics_before, stream)
+            self._site_event(adapter, result)
             return result
     
-    def scrape_kusonime(self, max_pages=4):
+    def scrape_otakudesu(self, max_pages=4, page_workers=None):
+        """Scrape anime list from OtakuDesu with pagination."""
+        return self.scrape_site('otakudesu', max_pages, page_workers)
+    
+    def scrape_kusonime(self, max_pages=4, page_workers=None):
         """Scrape anime list from Kusonime with pagination."""
-        start_time = time.time()
-        base_url = 'https://kusonime.com/'
-        all_anime = []
-        pages_successfully_scraped = 0
+        return self.scrape_site('kusonime', max_pages, page_workers)
+    
+    def _fetch_detail(self, adapter, url):
+        """Fetch and extract one detail page"""
+        response = self.fetch_page(url)
+        root = _html_root(response.content)
+        if root is None:
+            raise ValueError(f'Halaman detail kosong: {url}')
+        return adapter.extract_detail(root)
+
+    def crawl_details(self, site_name, max_items=None, workers=4):
+        """Fetch the detail page of every listed item of a site into results/<site>_details.json.
 
-        print(f"[Kusonime] Mulai scraping. Target: {max_pages} halaman.")
+        Item links go through a deduplicated frontier drained by `workers`
+        threads; fetch_page keeps the per-host limit and delay. Details are
+        cached by URL together with adapter.detail_version(item) and only
+        re-fetched when that version changes in the listing (e.g. a new episode).
+        Concurrent crawls of one site each add their fetched details to the
+        stored file instead of overwriting each other's.
+        """
+        adapter = self.sites[site_name]
+        listing = self.load_json(f'{site_name}.json')
+        if not listing:
+            return None
+        start_time = time.time()
+        store_name = f'{site_name}_details.json'
+        stored = self.load_json(store_name) or {}
+        details = stored.get('details', {})
+        fresh = {}
         
-        try:
-            for page in range(1, max_pages + 1):
-                if page == 1:
-                    url = base_url
-                else:
-                    url = f'https://kusonime.com/page/{page}/'
-                
-                print(f"[Kusonime] Scraping halaman {page}: {url}")
-                response = requests.get(url, headers=self.headers, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                posts = soup.find_all('div', class_='detpost')
-                if not posts:
-                    print(f"[Kusonime] 'div.detpost' tidak ditemukan di hal {page}, mencoba 'article'...")
-                    posts = soup.find_all('article')
-
-                if not posts:
-                    print(f"[Kusonime] Halaman {page} kosong. Berhenti.")
-                    break
-                
-                page_item_count = 0
-                for post in posts:
-                    try:
-                        title_elem = post.find(['h2', 'h1'], class_=['episodeye', 'title'])
-                        if not title_elem:
-                            title_elem = post.find('a', rel='bookmark')
-                        title = title_elem.text.strip() if title_elem else 'N/A'
-                        
-                        link_elem = post.find('a', rel='bookmark') or post.find('a')
-                        link = link_elem['href'] if link_elem and 'href' in link_elem.attrs else 'N/A'
-                        
-                        img_elem = post.find('img')
-                        image = img_elem['src'] if img_elem and 'src' in img_elem.attrs else 'https://via.placeholder.com/150'
-                        
-                        date_elem = post.find('i', class_='fa-clock-o')
-                        if date_elem:
-                            date = date_elem.parent.text.strip()
-                        else:
-                            date_elem = post.find('time') or post.find('span', class_='date')
-                            date = date_elem.text.strip() if date_elem else 'N/A'
-                        
-                        genre_p = post.find('i', class_='fa-tag')
-                        if genre_p:
-                            genre_links = genre_p.parent.find_all('a')
-                            genre = ', '.join([a.text.strip() for a in genre_links])
-                        else:
-                            genre_elem = post.find('span', class_='romaji')
-                            genre = genre_elem.text.strip() if genre_elem else 'N/A'
-                        
-                        summary_elem = post.find('div', class_='excerpt') or post.find('p')
-                        summary_text = summary_elem.text.strip() if summary_elem else 'N/A'
-                        
-                        if summary_text in [genre, date]:
-                            summary = 'N/A'
-                        else:
-                            summary = summary_text[:100] + '...' if summary_text != 'N/A' else 'N/A'
-
-                        all_anime.append({
-                            'title': title,
-                            'date': date,
-                            'genre': genre,
-                            'summary': summary,
-                            'image': image,
-                            'link': link,
-                            'source_page': page
-                        })
-                        page_item_count += 1
-                    except Exception as e:
-                        print(f"Error parsing Kusonime item: {e}")
-                        continue
-                
-                print(f"[Kusonime] Selesai halaman {page}, {page_item_count} item ditemukan.")
-                pages_successfully_scraped = page
-                time.sleep(0.5) 
-
-            end_time = time.time()
-            execution_time = end_time - start_time
-            
-            result = {
-                'success': True,
-                'site': 'Kusonime',
-                'url': base_url,
-                'pages_scraped': pages_successfully_scraped,
-                'timestamp': datetime.now().isoformat(),
-                'execution_time': execution_time,
-                'data': all_anime,
-                'count': len(all_anime)
-            }
-            
-            with open(f'{self.results_dir}/kusonime.json', 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            self.save_to_history('kusonime', result)
-            
-            print(f"✓ Kusonime scraped: {len(all_anime)} anime in {execution_time:.2f}s")
-            return result
-            
-        except Exception as e:
-            end_time = time.time()
-            execution_time = end_time - start_time
+        frontier = Frontier()
+        reused = set()
+        for anime in listing.get('data', [])[:max_items]:
+            link = anime.get('link')
+            if not link or link == 'N/A' or link in reused:
+                continue
+            version = adapter.detail_version(anime)
+            cached = details.get(link)
+            if cached is not None and cached.get('version') == version:
+                reused.add(link)
+                continue
+            frontier.add(link, version)
+        reused = len(reused)
+        
+        print(f"[{adapter.label}] Crawl detail: {len(frontier)} halaman diambil, {reused} dari cache.")
+        failed = []
+        lock = threading.Lock()
+        
+        def drain():
+            while True:
+                task = frontier.pop()
+                if task is None:
+                    return
+                url, version = task
+                try:
+                    detail = self._fetch_detail(adapter, url)
+                except Exception as e:
+                    print(f"[{adapter.label}] Detail gagal {url}: {e}")
+                    with lock:
+                        failed.append({'link': url, 'error': str(e)})
+                    continue
+                with lock:
+                    fresh[url] = {'version': version, 'fetched_at': datetime.now().isoformat(),
+                                  **detail}
+        
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for _ in range(max(workers, 1)):
+                executor.submit(drain)
+        
+        fetched = len(frontier.seen) - len(failed)
+        # Read-modify-write under the file's lock so a concurrent crawl is not lost
+        with self._result_lock(store_name):
+            details = (self.load_json(store_name) or {}).get('details', {})
+            details.update(fresh)
             result = {
-                'success': False,
-                'site': 'Kusonime',
-                'url': base_url,
-                'pages_scraped': pages_successfully_scraped,
+                'site': adapter.site,
                 'timestamp': datetime.now().isoformat(),
-                'execution_time': execution_time,
-                'error': str(e),
-                'data': all_anime
+                'execution_time': time.time() - start_time,
+                'fetched': fetched,
+                'reused': reused,
+                'failed': failed,
+                'count': len(details),
+                'details': details
             }
-            with open(f'{self.results_dir}/kusonime.json', 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            self.save_to_history('kusonime', result)
-            return result
-    
-    def scrape_parallel(self, max_workers=2, max_pages_per_site=1):
-        """Scrape websites in parallel using ThreadPoolExecutor with pagination."""
+            self._write_result(store_name, result)
+        self.progress.publish('details_finished', site=adapter.name, label=adapter.label,
+                              fetched=fetched, reused=reused, failed=len(failed),
+                              execution_time=result['execution_time'])
+        print(f"✓ {adapter.site} detail: {fetched} diambil, {reused} dari cache, "
+              f"{len(failed)} gagal dalam {result['execution_time']:.2f}s")
+        return {key: value for key, value in result.items() if key != 'details'}
+
+    def cache_thumbnails(self, sites=None, workers=4):
+        """Download posters of the listed items that are not cached locally yet"""
+        if sites is None:
+            sites = list(self.sites)
+        urls = []
+        for site_name in sites:
+            result = self.load_json(f'{site_name}.json')
+            urls.extend(anime.get('image') for anime in (result or {}).get('data', [])
+                        if anime.get('image') not in (None, 'N/A', PLACEHOLDER_IMAGE))
+        
+        stored, failed = self.thumbnails.cache_urls(urls, lambda url: self.fetch_page(url).content, workers)
+        print(f"✓ Thumbnail: {stored} disimpan, {failed} gagal.")
+        return {'stored': stored, 'failed': failed}
+
+    def scrape_parallel(self, max_workers=None, max_pages_per_site=1, page_workers=None, sites=None,
+                        incremental=False, resume=False):
+        """Scrape websites in parallel using ThreadPoolExecutor with pagination.
+
+        sites defaults to every registered site adapter, max_workers to one thread per site.
+        incremental and resume are passed on to scrape_site.
+        """
+        if sites is None:
+            sites = list(self.sites)
         print(f"Starting parallel scraping... (Target: {max_pages_per_site} halaman per situs)")
         start_time = time.time()
         
         results = []
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_otaku = executor.submit(self.scrape_otakudesu, max_pages=max_pages_per_site)
-            future_kuso = executor.submit(self.scrape_kusonime, max_pages=max_pages_per_site)
-
-            futures = {future_otaku: "Otakudesu", future_kuso: "Kusonime"}
+        with ThreadPoolExecutor(max_workers=max_workers or len(sites)) as executor:
+            futures = {
+                executor.submit(self.scrape_site, site_name, max_pages_per_site, page_workers,
+                                incremental, resume): site_name
+                for site_name in sites
+            }
             
             for future in as_completed(futures):
                 site_name = futures[future]
@@ -367,7 +890,7 @@ class AnimeScraper:
                     print(f"Error besar dalam thread {site_name}: {e}")
                     results.append({
                         'success': False, 
-                        'site': site_name, 
+                        'site': self.sites[site_name].site, 
                         'error': str(e), 
                         'data': [], 
                         'count': 0,
@@ -378,8 +901,8 @@ class AnimeScraper:
         end_time = time.time()
         total_time = end_time - start_time
         
-        # Create merged data
-        self.merge_anime_data()
+        # Update merged data from what changed in this run
+        self.merge_incremental(results)
         
         print(f"\n✓ Total parallel execution time: {total_time:.2f}s")
         print(f"✓ Results saved to '{self.results_dir}/' directory")
@@ -390,6 +913,189 @@ class AnimeScraper:
             'results': results
         }
 
+    async def _fetch_page_async(self, session, url, global_limit, headers=None, skip=None):
+        """Async counterpart of fetch_page; returns (status, headers, body), body b'' on 404.
+
+        The request holds one global slot and one slot of the host's rate
+        limiter. If skip() is true once the host slot is free, nothing is
+        fetched and (None, None, b'') is returned.
+        """
+        site = self._site_of(url)
+        for attempt in range(self.max_retries + 1):
+            try:
+                waited = time.perf_counter()
+                async with self.rate_limiter.slot_async(url) as feedback:
+                    self.metrics.observe('delay', time.perf_counter() - waited, site)
+                    if skip is not None and skip():
+                        return None, None, b''
+                    async with global_limit:
+                        started = time.perf_counter()
+                        async with session.get(url, headers=headers) as response:
+                            headers_at = time.perf_counter()
+                            status = response.status
+                            response_headers = response.headers
+                            body = await response.read()
+                        feedback.update(status=status, latency=headers_at - started,
+                                        retry_after=retry_after_seconds(response_headers.get('Retry-After')))
+                        self._record_response(site, status, started, headers_at, body)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            else:
+                if status == 404:
+                    return status, response_headers, b''
+                if status < 400:
+                    return status, response_headers, body
+                error = RuntimeError(f'HTTP {status} untuk {url}')
+                if status not in RETRY_STATUSES:
+                    raise error
+            if attempt >= self.max_retries:
+                raise error
+            delay = random.uniform(0, self.backoff_factor * (2 ** attempt))
+            print(f"Retry {attempt + 1}/{self.max_retries} untuk {url} dalam {delay:.2f}s: {error}")
+            self.metrics.inc('scraper_retries_total', site=site)
+            self.metrics.observe('backoff', delay, site)
+            await asyncio.sleep(delay)
+
+    async def _scrape_page_async(self, session, adapter, page, crawl, global_limit):
+        """Fetch and parse one listing page; returns (page, items, error)"""
+        # Pages past the lowest empty page seen so far are skipped before fetching
+        if page > crawl['stop_page']:
+            return page, [], None
+        if page in crawl['done']:
+            items = self._reuse_page(adapter, page, crawl['done'][page])
+        else:
+            items, error = await self._fetch_listing_async(session, adapter, page, crawl, global_limit)
+            if error is not None:
+                return page, None, error
+        # Pages after an empty page, or after one with nothing new, are not needed
+        if not items or (crawl['stop'] is not None and crawl['stop'](items)):
+            crawl['stop_page'] = min(crawl['stop_page'], page)
+        return page, items, None
+
+    async def _fetch_listing_async(self, session, adapter, page, crawl, global_limit):
+        """Fetch, parse and checkpoint one listing page; returns (items, error).
+
+        A page skipped by the stop_page check comes back as ([], None).
+        """
+        url = adapter.page_url(page)
+        print(f"[{adapter.label}] Scraping halaman {page}: {url}")
+        started = time.time()
+        self.progress.publish('page_started', site=adapter.name, label=adapter.label, page=page, url=url)
+        entry, headers = self._cached_entry(url)
+        try:
+            status, response_headers, body = await self._fetch_page_async(
+                session, url, global_limit, headers=headers,
+                skip=lambda: page > crawl['stop_page'])
+        except Exception as e:
+            self._page_event(adapter, page, started, error=e)
+            return None, e
+        if status is None:
+            return [], None
+        if status == 404:
+            items = []
+        else:
+            items = self._page_items(adapter, url, page, entry, status, response_headers, body)
+            crawl['checkpoint'].record(page, items)
+        self._page_event(adapter, page, started, items=items)
+        if items:
+            print(f"[{adapter.label}] Selesai halaman {page}, {len(items)} item ditemukan.")
+        return items, None
+
+    async def _finish_site_async(self, adapter, start_time, page_tasks, crawl):
+        """Wait for a site's page tasks, then build and save its result"""
+        all_anime = []
+        failed_pages = []
+        pages_scraped = 0
+        outcomes = await asyncio.gather(*page_tasks)
+
+        try:
+            pages_scraped = self._collect_pages(adapter.label, outcomes, all_anime, failed_pages,
+                                                crawl['stop'], crawl['stream'], unique=bool(crawl['done']))
+            if crawl['known'] is not None:
+                all_anime = self._merge_known(adapter, all_anime, crawl['previous'], crawl['known'],
+                                               pages_scraped, failed_pages)
+            result = self._site_result(adapter.site, adapter.base_url, start_time,
+                                       all_anime, failed_pages, pages_scraped)
+            print(f"✓ {adapter.site} scraped: {len(all_anime)} anime in {result['execution_time']:.2f}s")
+        except Exception as e:
+            result = self._site_result(adapter.site, adapter.base_url, start_time,
+                                       all_anime, failed_pages, pages_scraped, error=e)
+        self._save_site_result(adapter.name, result, crawl['metrics_before'], crawl['stream'])
+        self._finish_checkpoint(crawl['checkpoint'], result)
+        self._site_event(adapter, result)
+        return result
+
+    async def _scrape_async(self, sites, max_pages, concurrency, per_host_limit, incremental=False,
+                            resume=False):
+        global_limit = asyncio.Semaphore(concurrency)
+        adapters = [self.sites[site_name] for site_name in sites]
+        start_time = time.time()
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host_limit)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector,
+                                         timeout=timeout) as session:
+            page_tasks = {adapter.name: [] for adapter in adapters}
+            crawls = {}
+            for adapter in adapters:
+                previous, known = self._known_items(adapter) if incremental else (None, None)
+                checkpoint, done = self._checkpoint(adapter, max_pages, resume)
+                crawls[adapter.name] = {
+                    'stop_page': max_pages + 1,
+                    'previous': previous,
+                    'known': known,
+                    'stop': self._only_known(adapter, known) if known is not None else None,
+                    'metrics_before': self.metrics.site_summary(adapter.name),
+                    'stream': self._item_stream(adapter.name),
+                    'checkpoint': checkpoint,
+                    'done': done
+                }
+                print(f"[{adapter.label}] Mulai scraping (async). Target: {max_pages} halaman.")
+                self.progress.publish('site_started', site=adapter.name, label=adapter.label,
+                                      max_pages=max_pages)
+            # Create tasks page-major so the global limit is shared round-robin across sites
+            for page in range(1, max_pages + 1):
+                for adapter in adapters:
+                    page_tasks[adapter.name].append(asyncio.create_task(self._scrape_page_async(
+                        session, adapter, page, crawls[adapter.name], global_limit)))
+            return await asyncio.gather(*(
+                self._finish_site_async(adapter, start_time, page_tasks[adapter.name],
+                                        crawls[adapter.name])
+                for adapter in adapters
+            ))
+
+    def scrape_async(self, sites=None, max_pages=1, concurrency=100, incremental=False, resume=False):
+        """Scrape all pages of all sites on one asyncio event loop (requires aiohttp).
+
+        concurrency caps in-flight requests globally; the shared rate limiter caps
+        them per host. Writes the same results/ and history/ output as scrape_parallel;
+        incremental and resume work as in scrape_site.
+        """
+        if aiohttp is None:
+            raise RuntimeError('scrape_async membutuhkan aiohttp (pip install aiohttp)')
+        if sites is None:
+            sites = list(self.sites)
+        # A zero or negative limit would leave every page waiting forever
+        concurrency = max(concurrency, 1)
+        
+        print(f"Starting async scraping... (Target: {max_pages} halaman per situs)")
+        start_time = time.time()
+        
+        results = asyncio.run(self._scrape_async(sites, max_pages, concurrency,
+                                                 self.max_per_host, incremental, resume))
+        
+        total_time = time.time() - start_time
+        
+        self.merge_incremental(results)
+        
+        print(f"\n✓ Total async execution time: {total_time:.2f}s")
+        print(f"✓ Results saved to '{self.results_dir}/' directory")
+        
+        return {
+            'method': 'Async (asyncio + aiohttp)',
+            'total_execution_time': total_time,
+            'results': list(results)
+        }
+
 if __name__ == '__main__':
     scraper = AnimeScraper()
     print("--- MENJALANKAN SCRAPE UNTUK 2 HALAMAN ---")
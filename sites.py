@@ -0,0 +1,334 @@
+from bs4 import SoupStrainer
+from lxml import etree
+
+PLACEHOLDER_IMAGE = 'https://via.placeholder.com/150'
+
+
+def _class_tokens(attrs):
+    value = attrs.get('class') or ''
+    return value.split() if isinstance(value, str) else value
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _first(xpath, node):
+    found = xpath(node)
+    return found[0] if found else None
+
+
+def _text(elem):
+    return elem.text_content().strip() if elem is not None else 'N/A'
+
+
+def _texts(xpath, node):
+    return [text for text in (_text(elem) for elem in xpath(node)) if text]
+
+
+def _links(xpath, node):
+    """[{'title', 'link'}] for the <a> elements matched by xpath"""
+    return [{'title': _text(a), 'link': a.get('href')} for a in xpath(node) if a.get('href')]
+
+
+def _soup_text(elem):
+    return elem.text.strip() if elem else 'N/A'
+
+
+def _soup_attr(elem, attr, default):
+    return elem[attr] if elem and attr in elem.attrs else default
+
+
+class SiteAdapter:
+    """Declarative description of one listing site.
+
+    An adapter describes the URL pattern and pagination, where the items sit
+    on a listing page, and how to extract the fields of one item, either from
+    a BeautifulSoup tag (extract) or from an lxml element (extract_xpath).
+    AnimeScraper runs every adapter through the same fetch/parse pipeline, so
+    adding a site means writing an adapter and registering it.
+    """
+
+    name = None           # key for results/<name>.json, history and routes
+    site = None           # display name stored in results
+    label = None          # log prefix
+    base_url = None       # first listing page
+    page_path = 'page/{page}/'
+    template = None       # Flask template for the site view
+    item_selector = {}    # BeautifulSoup find_all() arguments for the items
+    item_xpath = None     # compiled XPath selecting the items
+    detail_xpath = {}     # compiled XPaths used by extract_detail
+
+    def __init__(self):
+        # Only build the item containers instead of the whole page tree
+        self.strainer = SoupStrainer(**self.item_selector)
+
+    def page_url(self, page):
+        """Build the URL of a listing page"""
+        if page == 1:
+            return self.base_url
+        return self.base_url + self.page_path.format(page=page)
+
+    def find_items(self, soup, page):
+        """Return the item containers of a parsed listing page"""
+        return soup.find_all(**self.item_selector)
+
+    def find_items_xpath(self, root):
+        return self.item_xpath(root)
+
+    def item_key(self, anime):
+        """Identity of an extracted item version, used to stop incremental crawls at known pages"""
+        return (anime.get('link'), anime.get('episode'))
+
+    def detail_version(self, anime):
+        """Listing value that changes when the item's detail page needs a re-fetch"""
+        return anime.get('episode')
+
+    def extract_detail(self, root):
+        """Extract synopsis, info, episodes and downloads from a detail page's lxml root"""
+        raise NotImplementedError
+
+    def extract(self, item):
+        """Extract the fields of one item from a BeautifulSoup tag"""
+        raise NotImplementedError
+
+    def extract_xpath(self, item):
+        """Extract the fields of one item from an lxml element"""
+        raise NotImplementedError
+
+
+class OtakuDesuAdapter(SiteAdapter):
+    name = 'otakudesu'
+    site = 'OtakuDesu'
+    label = 'Otakudesu'
+    base_url = 'https://otakudesu.best/ongoing-anime/'
+    template = 'otakudesu.html'
+    item_selector = {'name': 'div', 'class_': 'detpost'}
+    item_xpath = etree.XPath(f"//div[{_has_class('detpost')}]")
+
+    xpath = {
+        'title': etree.XPath(f".//h2[{_has_class('jdlflm')}]"),
+        'link': etree.XPath(".//a"),
+        'image': etree.XPath(".//img"),
+        'episode': etree.XPath(f".//div[{_has_class('epz')}]"),
+        'day': etree.XPath(f".//div[{_has_class('epztipe')}]"),
+        'rating': etree.XPath(f".//div[{_has_class('bt')}]"),
+    }
+
+    detail_xpath = {
+        'synopsis': etree.XPath(f"//div[{_has_class('sinopc')}]//p"),
+        'info': etree.XPath(f"//div[{_has_class('infozingle')}]//p"),
+        'episodes': etree.XPath(f"//div[{_has_class('episodelist')}]//li//a"),
+        'downloads': etree.XPath(f"//div[{_has_class('download')}]//li//a"),
+    }
+
+    def extract_detail(self, root):
+        info = {}
+        for line in _texts(self.detail_xpath['info'], root):
+            key, sep, value = line.partition(':')
+            if sep:
+                info[key.strip().lower()] = value.strip()
+        return {
+            'synopsis': '\n'.join(_texts(self.detail_xpath['synopsis'], root)),
+            'info': info,
+            'episodes': _links(self.detail_xpath['episodes'], root),
+            'downloads': _links(self.detail_xpath['downloads'], root)
+        }
+
+    def extract(self, item):
+        return {
+            'title': _soup_text(item.find('h2', class_='jdlflm')),
+            'episode': _soup_text(item.find('div', class_='epz')),
+            'day': _soup_text(item.find('div', class_='epztipe')),
+            'rating': _soup_text(item.find('div', class_='bt')),
+            'image': _soup_attr(item.find('img'), 'src', PLACEHOLDER_IMAGE),
+            'link': _soup_attr(item.find('a'), 'href', 'N/A')
+        }
+
+    def extract_xpath(self, item):
+        link_elem = _first(self.xpath['link'], item)
+        img_elem = _first(self.xpath['image'], item)
+        return {
+            'title': _text(_first(self.xpath['title'], item)),
+            'episode': _text(_first(self.xpath['episode'], item)),
+            'day': _text(_first(self.xpath['day'], item)),
+            'rating': _text(_first(self.xpath['rating'], item)),
+            'image': img_elem.get('src', PLACEHOLDER_IMAGE) if img_elem is not None else PLACEHOLDER_IMAGE,
+            'link': link_elem.get('href', 'N/A') if link_elem is not None else 'N/A'
+        }
+
+
+def _is_kusonime_container(name, attrs):
+    return name == 'article' or (name == 'div' and 'detpost' in _class_tokens(attrs))
+
+
+class KusonimeAdapter(SiteAdapter):
+    name = 'kusonime'
+    site = 'Kusonime'
+    label = 'Kusonime'
+    base_url = 'https://kusonime.com/'
+    template = 'kusonime.html'
+    item_selector = {'name': 'div', 'class_': 'detpost'}
+    item_xpath = etree.XPath(f"//div[{_has_class('detpost')}]")
+
+    xpath = {
+        'articles': etree.XPath("//article"),
+        'title': etree.XPath(f".//*[self::h2 or self::h1][{_has_class('episodeye')} or {_has_class('title')}]"),
+        'bookmark': etree.XPath(".//a[contains(concat(' ', normalize-space(@rel), ' '), ' bookmark ')]"),
+        'link': etree.XPath(".//a"),
+        'image': etree.XPath(".//img"),
+        'clock': etree.XPath(f".//i[{_has_class('fa-clock-o')}]"),
+        'time': etree.XPath(".//time"),
+        'date': etree.XPath(f".//span[{_has_class('date')}]"),
+        'tag': etree.XPath(f".//i[{_has_class('fa-tag')}]"),
+        'romaji': etree.XPath(f".//span[{_has_class('romaji')}]"),
+        'excerpt': etree.XPath(f".//div[{_has_class('excerpt')}]"),
+        'paragraph': etree.XPath(".//p"),
+    }
+
+    detail_xpath = {
+        'synopsis': etree.XPath(f"//div[{_has_class('lexot')}]/p"),
+        'info': etree.XPath(f"//div[{_has_class('info')}]//p"),
+        'download_groups': etree.XPath(f"//div[{_has_class('smokeddl')}]"),
+        'group_title': etree.XPath(f".//div[{_has_class('smokettl')}]"),
+        'download_rows': etree.XPath(f".//div[{_has_class('smokeurl')}]"),
+        'row_label': etree.XPath(".//strong"),
+        'row_links': etree.XPath(".//a"),
+    }
+
+    def __init__(self):
+        super().__init__()
+        # Posts are div.detpost, falling back to <article> on older layouts
+        self.strainer = SoupStrainer(_is_kusonime_container)
+
+    def find_items(self, soup, page):
+        posts = soup.find_all('div', class_='detpost')
+        if not posts:
+            print(f"[Kusonime] 'div.detpost' tidak ditemukan di hal {page}, mencoba 'article'...")
+            posts = soup.find_all('article')
+        return posts
+
+    def find_items_xpath(self, root):
+        return self.item_xpath(root) or self.xpath['articles'](root)
+
+    def detail_version(self, anime):
+        # Batch posts have no episode number; a changed title marks a re-release
+        return anime.get('title')
+
+    def extract_detail(self, root):
+        info = {}
+        for line in _texts(self.detail_xpath['info'], root):
+            key, sep, value = line.partition(':')
+            if sep:
+                info[key.strip().lower()] = value.strip()
+
+        downloads = []
+        for group in self.detail_xpath['download_groups'](root):
+            group_title = _text(_first(self.detail_xpath['group_title'], group))
+            for row in self.detail_xpath['download_rows'](group):
+                label = _text(_first(self.detail_xpath['row_label'], row))
+                for link in _links(self.detail_xpath['row_links'], row):
+                    downloads.append({'group': group_title, 'quality': label,
+                                      'title': link['title'], 'link': link['link']})
+        return {
+            'synopsis': '\n'.join(_texts(self.detail_xpath['synopsis'], root)),
+            'info': info,
+            'episodes': [],
+            'downloads': downloads
+        }
+
+    @staticmethod
+    def _summary(summary_text, genre, date):
+        if summary_text in [genre, date]:
+            return 'N/A'
+        return summary_text[:100] + '...' if summary_text != 'N/A' else 'N/A'
+
+    def extract(self, post):
+        title_elem = post.find(['h2', 'h1'], class_=['episodeye', 'title'])
+        if not title_elem:
+            title_elem = post.find('a', rel='bookmark')
+        title = _soup_text(title_elem)
+
+        link_elem = post.find('a', rel='bookmark') or post.find('a')
+        link = _soup_attr(link_elem, 'href', 'N/A')
+
+        image = _soup_attr(post.find('img'), 'src', PLACEHOLDER_IMAGE)
+
+        date_elem = post.find('i', class_='fa-clock-o')
+        if date_elem:
+            date = date_elem.parent.text.strip()
+        else:
+            date = _soup_text(post.find('time') or post.find('span', class_='date'))
+
+        genre_p = post.find('i', class_='fa-tag')
+        if genre_p:
+            genre_links = genre_p.parent.find_all('a')
+            genre = ', '.join([a.text.strip() for a in genre_links])
+        else:
+            genre = _soup_text(post.find('span', class_='romaji'))
+
+        summary_text = _soup_text(post.find('div', class_='excerpt') or post.find('p'))
+
+        return {
+            'title': title,
+            'date': date,
+            'genre': genre,
+            'summary': self._summary(summary_text, genre, date),
+            'image': image,
+            'link': link
+        }
+
+    def extract_xpath(self, post):
+        bookmark = _first(self.xpath['bookmark'], post)
+        title_elem = _first(self.xpath['title'], post)
+        if title_elem is None:
+            title_elem = bookmark
+        title = _text(title_elem)
+
+        link_elem = bookmark if bookmark is not None else _first(self.xpath['link'], post)
+        link = link_elem.get('href', 'N/A') if link_elem is not None else 'N/A'
+
+        img_elem = _first(self.xpath['image'], post)
+        image = img_elem.get('src', PLACEHOLDER_IMAGE) if img_elem is not None else PLACEHOLDER_IMAGE
+
+        clock = _first(self.xpath['clock'], post)
+        if clock is not None:
+            date = _text(clock.getparent())
+        else:
+            date_elem = _first(self.xpath['time'], post)
+            if date_elem is None:
+                date_elem = _first(self.xpath['date'], post)
+            date = _text(date_elem)
+
+        tag = _first(self.xpath['tag'], post)
+        if tag is not None:
+            genre = ', '.join(_text(a) for a in self.xpath['link'](tag.getparent()))
+        else:
+            genre = _text(_first(self.xpath['romaji'], post))
+
+        summary_elem = _first(self.xpath['excerpt'], post)
+        if summary_elem is None:
+            summary_elem = _first(self.xpath['paragraph'], post)
+
+        return {
+            'title': title,
+            'date': date,
+            'genre': genre,
+            'summary': self._summary(_text(summary_elem), genre, date),
+            'image': image,
+            'link': link
+        }
+
+
+# Registered site adapters, in scheduling order
+SITES = {}
+
+
+def register_site(adapter):
+    """Add a site adapter instance to the registry"""
+    SITES[adapter.name] = adapter
+    return adapter
+
+
+register_site(OtakuDesuAdapter())
+register_site(KusonimeAdapter())
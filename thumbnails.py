@@ -0,0 +1,149 @@
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:  # optional, without it posters are cached at full size
+    Image = None
+
+
+class ThumbnailCache:
+    """Local copies of poster images, stored once under a content hash.
+
+    cache_urls() downloads posters not seen before, shrinks them to fit `size`
+    (when Pillow is installed) and writes them as <sha256 of the original>.<ext>,
+    so identical posters behind different URLs share one file. An index maps
+    source URLs to files. Serving a file refreshes its mtime, and evict()
+    removes the least recently used files once the directory grows past
+    max_bytes.
+    """
+
+    def __init__(self, cache_dir='thumbnails', max_bytes=200 * 1024 * 1024, size=(240, 340)):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.size = size
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.index = {}
+
+    def _save_index(self):
+        with self._lock:
+            snapshot = dict(self.index)
+        tmp_path = f'{self.index_path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.index_path)
+
+    def path(self, filename):
+        return os.path.join(self.cache_dir, os.path.basename(filename))
+
+    def lookup(self, url):
+        """Cached filename for a poster URL (None if not cached or evicted)"""
+        filename = self.index.get(url)
+        if filename is None or not os.path.exists(self.path(filename)):
+            return None
+        return filename
+
+    def _thumbnail(self, url, body):
+        """Return (bytes, extension) of the stored copy"""
+        if Image is not None:
+            try:
+                with Image.open(io.BytesIO(body)) as image:
+                    image = image.convert('RGB')
+                    image.thumbnail(self.size)
+                    out = io.BytesIO()
+                    image.save(out, 'JPEG', quality=80, optimize=True)
+                    return out.getvalue(), '.jpg'
+            except Exception as e:
+                print(f"[Thumbnail] Gagal resize {url}: {e}")
+        extension = os.path.splitext(url.split('?', 1)[0])[1].lower()
+        return body, extension if mimetypes.types_map.get(extension, '').startswith('image/') else '.img'
+
+    def store(self, url, body):
+        """Store one downloaded poster; returns its filename"""
+        digest = hashlib.sha256(body).hexdigest()
+        data, extension = self._thumbnail(url, body)
+        filename = f'{digest}{extension}'
+        path = self.path(filename)
+        if not os.path.exists(path):
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self.index[url] = filename
+        return filename
+
+    def cache_urls(self, urls, fetch, workers=4):
+        """Download and store every URL not cached yet with fetch(url) -> bytes.
+
+        Returns (stored, failed) counts.
+        """
+        missing = list(dict.fromkeys(url for url in urls if url and self.lookup(url) is None))
+        failed = 0
+
+        def download(url):
+            try:
+                self.store(url, fetch(url))
+                return True
+            except Exception as e:
+                print(f"[Thumbnail] Gagal mengambil {url}: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for ok in executor.map(download, missing):
+                failed += not ok
+
+        if missing:
+            self._save_index()
+            self.evict()
+        return len(missing) - failed, failed
+
+    def touch(self, filename):
+        """Mark a file as recently used"""
+        try:
+            os.utime(self.path(filename))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Remove least recently used files until the directory fits max_bytes"""
+        with self._lock:
+            files = []
+            total = 0
+            for filename in os.listdir(self.cache_dir):
+                if filename == 'index.json' or filename.endswith('.tmp'):
+                    continue
+                try:
+                    stat = os.stat(self.path(filename))
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, filename))
+                total += stat.st_size
+
+            removed = set()
+            for _, size, filename in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(self.path(filename))
+                except FileNotFoundError:
+                    pass
+                removed.add(filename)
+                total -= size
+
+            if removed:
+                self.index = {url: name for url, name in self.index.items() if name not in removed}
+        if removed:
+            self._save_index()
+        return len(removed)
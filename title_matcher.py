@@ -0,0 +1,308 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+# Release/packaging words that say nothing about which anime it is
+RELEASE_SUFFIXES = re.compile(
+    r'\b(subtitle indonesia|sub indo|bd batch|batch|bluray|blu ray|bd|'
+    r'episode \d+(\s*-\s*\d+)?|eps? \d+|end|tamat)\b'
+)
+SEASON_PATTERNS = [
+    re.compile(r'\bseason (\d+)\b'),
+    re.compile(r'\b(\d+)(?:st|nd|rd|th) season\b'),
+    re.compile(r'\bs(\d+)\b'),
+]
+NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def split_title(title):
+    """Normalize a title into (base title, season number).
+
+    Lowercases, strips accents, punctuation and release suffixes such as
+    "Sub Indo" or "BD Batch", and pulls out "Season 2" / "2nd Season" / "S2"
+    so differently written seasons compare equal. Titles without a season
+    are season 1.
+    """
+    text = unicodedata.normalize('NFKD', title or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = NON_WORD.sub(' ', text)
+    text = RELEASE_SUFFIXES.sub(' ', text)
+
+    season = 1
+    for pattern in SEASON_PATTERNS:
+        found = pattern.search(text)
+        if found:
+            season = int(found.group(1))
+            text = pattern.sub(' ', text)
+            break
+
+    return ' '.join(text.split()), season
+
+
+def normalize_title(title):
+    """Normalized base title used for exact comparison"""
+    return split_title(title)[0]
+
+
+def _grams(text, n=3):
+    padded = f'  {text} '
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def catalog_keys(items):
+    """Keys of a catalog's items: (link, title, n), n counting repeats of the same pair.
+
+    Full and incremental matching key items the same way, so ties in candidate
+    ranking and assignment are broken identically by both.
+    """
+    seen = {}
+    keys = []
+    for anime in items:
+        pair = (anime.get('link') or '', anime.get('title') or '')
+        keys.append(pair + (seen.get(pair, 0),))
+        seen[pair] = seen.get(pair, 0) + 1
+    return keys
+
+
+class TitleIndex:
+    """Trigram inverted index over normalized titles, used for candidate blocking.
+
+    Lookups only score entries that share trigrams with the query, so matching
+    stays close to linear instead of comparing every pair of titles. Grams
+    whose posting list grows past max_postings are too common to narrow the
+    search and are skipped at lookup time.
+    """
+
+    def __init__(self, max_postings=200):
+        self.max_postings = max_postings
+        self.entries = {}
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, title):
+        base, season = split_title(title)
+        self.remove(key)
+        grams = _grams(base)
+        self.entries[key] = (base, season, grams)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry[2]:
+            keys = self.postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.postings[gram]
+
+    def candidates(self, base, limit=10):
+        """Return up to limit keys sharing the most trigrams with base (ties by key)"""
+        shared = {}
+        for gram in _grams(base):
+            keys = self.postings.get(gram)
+            if not keys or len(keys) > self.max_postings:
+                continue
+            for key in keys:
+                shared[key] = shared.get(key, 0) + 1
+        return sorted(shared, key=lambda key: (-shared[key], key))[:limit]
+
+
+class TitleMatcher:
+    """Fuzzy one-to-one title matching between two catalogs.
+
+    Scores are 0-100: the SequenceMatcher ratio of the normalized base titles,
+    minus season_penalty when the seasons differ. Candidate pairs are blocked
+    symmetrically: a pair is scored when either title is among the other's
+    candidate_limit closest titles by shared trigrams. Pairs scoring at least
+    threshold are assigned greedily, best score first.
+    """
+
+    def __init__(self, threshold=85, season_penalty=20, candidate_limit=10):
+        self.threshold = threshold
+        self.season_penalty = season_penalty
+        self.candidate_limit = candidate_limit
+
+    def score(self, left, right, minimum=0):
+        """Similarity score between two (base, season) pairs.
+
+        Returns 0 early when the cheap upper bounds already fall below minimum.
+        """
+        left_base, left_season = left[:2]
+        right_base, right_season = right[:2]
+        if not left_base or not right_base:
+            return 0
+        penalty = self.season_penalty if left_season != right_season else 0
+        if left_base == right_base:
+            ratio = 1.0
+        else:
+            matcher = SequenceMatcher(None, left_base, right_base)
+            needed = (minimum + penalty) / 100
+            if matcher.real_quick_ratio() < needed or matcher.quick_ratio() < needed:
+                return 0
+            ratio = matcher.ratio()
+        return max(ratio * 100 - penalty, 0)
+
+    def candidate_pairs(self, left_index, right_index):
+        """Yield (score, left_key, right_key) for blocked pairs above threshold"""
+        pairs = set()
+        for left_key, entry in left_index.entries.items():
+            pairs.update((left_key, right_key)
+                         for right_key in right_index.candidates(entry[0], self.candidate_limit))
+        for right_key, entry in right_index.entries.items():
+            pairs.update((left_key, right_key)
+                         for left_key in left_index.candidates(entry[0], self.candidate_limit))
+        for left_key, right_key in pairs:
+            score = self.score(left_index.entries[left_key], right_index.entries[right_key], self.threshold)
+            if score >= self.threshold:
+                yield score, left_key, right_key
+
+    def assign(self, pairs):
+        """Greedy one-to-one assignment of scored pairs, best score first (ties by key)"""
+        assigned = {}
+        used_right = set()
+        for score, left_key, right_key in sorted(pairs, key=lambda p: (-p[0], p[1], p[2])):
+            if left_key in assigned or right_key in used_right:
+                continue
+            assigned[left_key] = (right_key, score)
+            used_right.add(right_key)
+        return assigned
+
+    def match(self, left_items, right_items):
+        """Match two lists of anime dicts by title.
+
+        Returns (matches, left_only, right_only) where matches is a list of
+        (left_item, right_item, score).
+        """
+        left_keys = catalog_keys(left_items)
+        right_keys = catalog_keys(right_items)
+        left_index = TitleIndex()
+        right_index = TitleIndex()
+        for key, anime in zip(left_keys, left_items):
+            left_index.add(key, anime.get('title', ''))
+        for key, anime in zip(right_keys, right_items):
+            right_index.add(key, anime.get('title', ''))
+
+        assigned = self.assign(self.candidate_pairs(left_index, right_index))
+        matched_right = {right_key for right_key, _ in assigned.values()}
+        right_by_key = dict(zip(right_keys, right_items))
+
+        matches = [(anime, right_by_key[assigned[key][0]], assigned[key][1])
+                   for key, anime in zip(left_keys, left_items) if key in assigned]
+        left_only = [anime for key, anime in zip(left_keys, left_items) if key not in assigned]
+        right_only = [anime for key, anime in zip(right_keys, right_items) if key not in matched_right]
+        return matches, left_only, right_only
+
+
+class IncrementalMatcher:
+    """Title matching state kept between merges, updated from deltas.
+
+    Both catalogs stay indexed in memory together with every key's candidate
+    keys on the other side and the scores of the blocked pairs. update() only
+    indexes the items that were added (and forgets removed ones), then
+    refreshes the candidates of those items and of the other side's items
+    whose lookups read a posting list that changed. The blocked pairs are
+    therefore exactly those of TitleMatcher.match, and the result equals a
+    full merge, while scoring cost tracks how much changed.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.items = {'left': {}, 'right': {}}
+        self.order = {'left': [], 'right': []}
+        self.indexes = {'left': TitleIndex(), 'right': TitleIndex()}
+        self.candidates = {'left': {}, 'right': {}}
+        self.scores = {}
+        self.assigned = {}
+
+    @staticmethod
+    def _other(side):
+        return 'right' if side == 'left' else 'left'
+
+    def _refresh_candidates(self, side, keys):
+        index = self.indexes[side]
+        other_index = self.indexes[self._other(side)]
+        for key in keys:
+            if key in index.entries:
+                self.candidates[side][key] = set(
+                    other_index.candidates(index.entries[key][0], self.matcher.candidate_limit))
+
+    def _rescore(self):
+        """Score new blocked pairs, drop stale ones and reassign"""
+        pairs = {(left_key, right_key)
+                 for left_key, right_keys in self.candidates['left'].items() for right_key in right_keys}
+        pairs.update((left_key, right_key)
+                     for right_key, left_keys in self.candidates['right'].items() for left_key in left_keys)
+        left_entries = self.indexes['left'].entries
+        right_entries = self.indexes['right'].entries
+        scores = {}
+        for pair in pairs:
+            score = self.scores.get(pair)
+            if score is None:
+                score = self.matcher.score(left_entries[pair[0]], right_entries[pair[1]],
+                                           self.matcher.threshold)
+            scores[pair] = score
+        self.scores = scores
+        self.assigned = self.matcher.assign(
+            (score, left_key, right_key) for (left_key, right_key), score in scores.items()
+            if score >= self.matcher.threshold)
+
+    def update(self, side, items):
+        """Replace one side's catalog; returns True if anything changed"""
+        order = catalog_keys(items)
+        new_items = dict(zip(order, items))
+
+        old_items = self.items[side]
+        removed = [key for key in old_items if key not in new_items]
+        added = [key for key in order if key not in old_items]
+        changed = (bool(removed or added) or order != self.order[side]
+                   or any(old_items[key] != new_items[key] for key in order if key in old_items))
+
+        index = self.indexes[side]
+        grams = set()
+        for key in removed:
+            grams |= index.entries[key][2]
+        for key in added:
+            grams |= _grams(normalize_title(new_items[key].get('title', '')))
+        before = {gram: len(index.postings.get(gram, ())) for gram in grams}
+
+        for key in removed:
+            index.remove(key)
+            self.candidates[side].pop(key, None)
+        for key in added:
+            index.add(key, new_items[key].get('title', ''))
+        self.items[side] = new_items
+        self.order[side] = order
+
+        if removed or added:
+            # Other-side keys whose lookups read a changed posting list (one that
+            # was not skipped as too common before or after the change)
+            other = self._other(side)
+            affected = set()
+            for gram in grams:
+                if min(before[gram], len(index.postings.get(gram, ()))) <= index.max_postings:
+                    affected |= self.indexes[other].postings.get(gram, set())
+            self._refresh_candidates(side, added)
+            self._refresh_candidates(other, affected)
+            self._rescore()
+        return changed
+
+    def result(self):
+        """Return (matches, left_only, right_only) in catalog order"""
+        left_items = self.items['left']
+        right_items = self.items['right']
+        matches = []
+        left_only = []
+        for key in self.order['left']:
+            if key in self.assigned:
+                right_key, score = self.assigned[key]
+                matches.append((left_items[key], right_items[right_key], score))
+            else:
+                left_only.append(left_items[key])
+        matched_right = {right_key for right_key, _ in self.assigned.values()}
+        right_only = [right_items[key] for key in self.order['right'] if key not in matched_right]
+        return matches, left_only, right_only